@@ -4,14 +4,20 @@ Batch processing script for enhanced clinical trial data extraction system.
 Processes all Marker-enhanced markdown files with progress tracking.
 """
 
+import argparse
 import os
 import sys
 import json
 import csv
 import time
+import asyncio
+import threading
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import glob
+from pathlib import Path
+
+import orjson
 
 # Add src to path
 sys.path.append('src')
@@ -21,6 +27,16 @@ from openai_client import OpenAIClient
 from enhanced_extractor import EnhancedClinicalExtractor
 from logger_config import get_logger
 
+def write_json(output_file: str, data: Any) -> None:
+    """Write data as indented UTF-8 JSON (orjson serializes in C, straight to bytes).
+
+    The file is written under a temporary name and renamed into place, so an
+    interrupted run never leaves a truncated file behind.
+    """
+    tmp_file = f"{output_file}.tmp"
+    Path(tmp_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp_file, output_file)
+
 def save_to_csv(data: Dict[str, Any], output_file: str) -> int:
     """Save data to CSV format with proper encoding"""
     if not data:
@@ -87,7 +103,6 @@ def create_combined_csv(results: List[Dict[str, Any]], output_dir: str) -> str:
             # Try to load the validated JSON data
             try:
                 pdf_number = result["pdf_number"]
-                timestamp = result.get("timestamp", datetime.now().strftime("%Y%m%d_%H%M%S"))
                 
                 # Find the validated JSON file for this PDF
                 json_pattern = os.path.join(output_dir, f'validated_{pdf_number}.json')
@@ -155,33 +170,33 @@ def create_combined_csv(results: List[Dict[str, Any]], output_dir: str) -> str:
     # Sort fields for consistent ordering
     field_order = sorted(list(all_fields))
     
-    # Write combined CSV
-    with open(combined_csv_file, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=field_order)
-        writer.writeheader()
-        
-        for row in all_rows:
-            # Ensure all fields are present (fill missing with empty string)
-            complete_row = {field: row.get(field, '') for field in field_order}
-            writer.writerow(complete_row)
+    # Write combined CSV (positional rows, missing fields filled with empty string)
+    with open(combined_csv_file, 'w', newline='', encoding='utf-8-sig', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(field_order)
+        writer.writerows(tuple(row.get(field, '') for field in field_order) for row in all_rows)
     
     print(f"✅ Combined CSV created: {os.path.basename(combined_csv_file)} ({len(all_rows)} rows)")
     return combined_csv_file
 
-def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIClient, 
-                           enhanced_extractor: EnhancedClinicalExtractor, 
-                           total_files: int, current_file: int) -> Dict[str, Any]:
-    """Process a single Marker-enhanced markdown file with enhanced system and progress tracking"""
+def prepare_markdown(markdown_path: str, enhanced_extractor: EnhancedClinicalExtractor,
+                     total_files: int, current_file: int) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Read and pre-validate a Marker-enhanced markdown file, building its focused prompt.
+
+    Returns the result record and the context finish_markdown needs, or None as the
+    context when the file cannot be sent to the LLM (the error is in the result).
+    """
     
     # Extract PDF number from filename (e.g., "15.md" -> "15")
     markdown_filename = os.path.basename(markdown_path)
-    pdf_number = markdown_filename.split('.')[0]  # Get the PDF number
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pdf_number = Path(markdown_path).stem  # Get the PDF number (dots inside the name are kept)
     
-    print(f"\n{'='*80}")
-    print(f"📄 Processing Markdown {current_file}/{total_files}: {markdown_filename}")
-    print(f"   📊 Source PDF: {pdf_number}.pdf")
-    print(f"{'='*80}")
+    print("\n".join([
+        f"\n{'='*80}",
+        f"📄 Processing Markdown {current_file}/{total_files}: {markdown_filename}",
+        f"   📊 Source PDF: {pdf_number}.pdf",
+        f"{'='*80}",
+    ]))
     
     result = {
         "markdown_file": markdown_path,
@@ -206,50 +221,102 @@ def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIC
         except Exception as e:
             result["error"] = f"Could not read markdown file: {str(e)}"
             print(f"❌ [{current_file}/{total_files}] Markdown reading failed")
-            return result
+            return result, None
         
         if not full_text:
             result["error"] = "Markdown file is empty"
             print(f"❌ [{current_file}/{total_files}] Markdown file is empty")
-            return result
+            return result, None
         
         result["text_length"] = len(full_text)
         print(f"✅ [{current_file}/{total_files}] Markdown content loaded: {len(full_text):,} characters")
         
-        # Stage 2: Pre-validation
+        # Stage 2: Pre-validation (focused prompt is built alongside and cached per text)
         print(f"🔄 [{current_file}/{total_files}] Pre-validation...")
-        can_process, validation_data = enhanced_extractor.pre_validate(full_text)
+        can_process, validation_data, focused_messages = enhanced_extractor.prepare_extraction(full_text)
         
         if not can_process:
             result["error"] = f"Pre-validation failed: {validation_data.get('errors', [])}"
             print(f"❌ [{current_file}/{total_files}] Pre-validation failed")
-            return result
+            return result, None
         
         result["nct_number"] = validation_data.get("nct_number")
         result["treatment_arms"] = validation_data.get("treatment_arms_count", 0)
         print(f"✅ [{current_file}/{total_files}] Pre-validation passed: NCT={result['nct_number']}, Arms={result['treatment_arms']}")
         
-        # Stage 3: Create focused prompt
-        print(f"🔄 [{current_file}/{total_files}] Creating focused prompt...")
-        focused_prompt = enhanced_extractor.create_focused_prompt(full_text, validation_data)
-        print(f"✅ [{current_file}/{total_files}] Focused prompt created: {len(focused_prompt):,} characters")
-        
-        # Stage 4: LLM Processing with progress tracking
-        print(f"🔄 [{current_file}/{total_files}] LLM Processing (this may take 1-2 minutes)...")
-        print(f"   📊 Sending request to OpenAI API...")
+        # Stage 3: Focused prompt
+        print(f"✅ [{current_file}/{total_files}] Focused prompt created: {sum(len(m['content']) for m in focused_messages):,} characters")
         
-        llm_start_time = time.time()
-        raw_response = client.get_chat_completion([{"role": "user", "content": focused_prompt}])
-        llm_end_time = time.time()
+        result["extraction_time"] = time.time() - start_time
+        context = {
+            "validation_data": validation_data,
+            "focused_messages": focused_messages,
+        }
+        return result, context
         
+    except Exception as e:
+        result["error"] = str(e)
+        result["extraction_time"] = time.time() - start_time
+        print(f"❌ [{current_file}/{total_files}] Processing failed: {str(e)}")
+        return result, None
+
+def print_progress(done: int, total: int, start_time: float) -> None:
+    """Print a one-line progress bar with elapsed time and an ETA from the average time per file"""
+    elapsed = time.time() - start_time
+    eta = elapsed / done * (total - done) if done else 0.0
+    filled = done * 30 // total if total else 30
+    print(f"📈 [{'█' * filled}{'░' * (30 - filled)}] {done}/{total} files | {elapsed:.0f}s elapsed | ETA {eta:.0f}s")
+
+def load_checkpoint(markdown_path: str, output_dir: str) -> Optional[Dict[str, Any]]:
+    """Rebuild the result record of a file already saved in output_dir, or None if it was not completed.
+
+    finish_markdown writes validated_<pdf>.json only after every other output of the
+    file, so its presence marks the file as complete.
+    """
+    pdf_number = Path(markdown_path).stem
+    validated_json_file = os.path.join(output_dir, f'validated_{pdf_number}.json')
+    try:
+        validated_data = orjson.loads(Path(validated_json_file).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    data = validated_data.get("data") or {}
+    treatment_arms = data.get("treatment_arms") or []
+    return {
+        "markdown_file": markdown_path,
+        "pdf_number": pdf_number,
+        "status": "success",
+        "error": None,
+        "extraction_time": 0,
+        "text_length": 0,
+        "nct_number": data.get("nct_number"),
+        "treatment_arms": len(treatment_arms),
+        "rows_generated": len(treatment_arms) or 1,
+        "resumed": True
+    }
+
+def finish_markdown(result: Dict[str, Any], context: Dict[str, Any], raw_response: Optional[str], request_time: float,
+                    output_dir: str, enhanced_extractor: EnhancedClinicalExtractor, total_files: int,
+                    current_file: int) -> Dict[str, Any]:
+    """Parse, validate and save the LLM response for a file prepared by prepare_markdown.
+
+    extraction_time covers preparing the file, the LLM request itself (request_time)
+    and saving the outputs, but not the time the request spent queued behind others.
+    """
+    
+    markdown_filename = os.path.basename(result["markdown_file"])
+    pdf_number = result["pdf_number"]
+    validation_data = context["validation_data"]
+    result["extraction_time"] += request_time
+    start_time = time.time() - result["extraction_time"]
+    
+    try:
         if not raw_response:
             result["error"] = "LLM processing failed - no response received"
+            result["extraction_time"] = time.time() - start_time
             print(f"❌ [{current_file}/{total_files}] LLM processing failed")
             return result
         
-        llm_time = llm_end_time - llm_start_time
-        print(f"✅ [{current_file}/{total_files}] LLM processing completed in {llm_time:.1f} seconds")
-        
         # Stage 5: Parse and validate response
         print(f"🔄 [{current_file}/{total_files}] Parsing LLM response...")
         try:
@@ -257,6 +324,7 @@ def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIC
             print(f"✅ [{current_file}/{total_files}] JSON parsing successful")
         except json.JSONDecodeError as e:
             result["error"] = f"Invalid JSON response from LLM: {str(e)}"
+            result["extraction_time"] = time.time() - start_time
             print(f"❌ [{current_file}/{total_files}] JSON parsing failed")
             return result
         
@@ -273,11 +341,6 @@ def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIC
         # Stage 7: Save outputs
         print(f"🔄 [{current_file}/{total_files}] Saving outputs...")
         
-        # Save validated JSON
-        validated_json_file = os.path.join(output_dir, f'validated_{pdf_number}.json')
-        with open(validated_json_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data, f, indent=4, ensure_ascii=False)
-        
         # Save validated CSV
         validated_csv_file = os.path.join(output_dir, f'validated_{pdf_number}.csv')
         rows_generated = save_to_csv(validated_data["data"], validated_csv_file)
@@ -285,23 +348,28 @@ def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIC
         
         # Save raw LLM response
         raw_json_file = os.path.join(output_dir, f'raw_llm_{pdf_number}.json')
-        with open(raw_json_file, 'w', encoding='utf-8') as f:
-            json.dump(raw_json, f, indent=4, ensure_ascii=False)
+        write_json(raw_json_file, raw_json)
         
-        print(f"✅ [{current_file}/{total_files}] Outputs saved:")
-        print(f"   📄 JSON: {os.path.basename(validated_json_file)}")
-        print(f"   📊 CSV: {os.path.basename(validated_csv_file)} ({rows_generated} rows)")
-        print(f"   🔍 Raw LLM: {os.path.basename(raw_json_file)}")
+        # Save validated JSON last: load_checkpoint treats it as the completion marker
+        validated_json_file = os.path.join(output_dir, f'validated_{pdf_number}.json')
+        write_json(validated_json_file, validated_data)
         
         # Update result
         result["status"] = "success"
         result["extraction_time"] = time.time() - start_time
         
-        print(f"✅ [{current_file}/{total_files}] Processing completed successfully!")
-        print(f"   ⏱️  Total time: {result['extraction_time']:.1f} seconds")
-        print(f"   📊 Validation: {validated_data['extraction_metadata']['validation_status']}")
-        print(f"   ⚠️  Errors: {len(validated_data['extraction_metadata']['errors'])}")
-        print(f"   ⚠️  Warnings: {len(validated_data['extraction_metadata']['warnings'])}")
+        # One write per report block, so reports of concurrently finishing files do not interleave
+        print("\n".join([
+            f"✅ [{current_file}/{total_files}] Outputs saved:",
+            f"   📄 JSON: {os.path.basename(validated_json_file)}",
+            f"   📊 CSV: {os.path.basename(validated_csv_file)} ({rows_generated} rows)",
+            f"   🔍 Raw LLM: {os.path.basename(raw_json_file)}",
+            f"✅ [{current_file}/{total_files}] Processing completed successfully!",
+            f"   ⏱️  Total time: {result['extraction_time']:.1f} seconds",
+            f"   📊 Validation: {validated_data['extraction_metadata']['validation_status']}",
+            f"   ⚠️  Errors: {len(validated_data['extraction_metadata']['errors'])}",
+            f"   ⚠️  Warnings: {len(validated_data['extraction_metadata']['warnings'])}",
+        ]))
         
         return result
         
@@ -314,17 +382,33 @@ def process_single_markdown(markdown_path: str, output_dir: str, client: OpenAIC
 def main():
     """Main batch processing function"""
     
+    run_start = datetime.now()
+    
     # Setup
     markdown_dir = "input/marker_preprocessed"
     
-    # Create sequential batch output directory
+    parser = argparse.ArgumentParser(description="Batch extraction over Marker-enhanced markdown files.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the latest batch output directory, skipping files that already have validated output")
+    args = parser.parse_args()
+    
+    # Create sequential batch output directory (or reuse the latest one when resuming)
     base_output_dir = "output"
     batch_counter = 1
     while os.path.exists(os.path.join(base_output_dir, f"batch_output_{batch_counter}")):
         batch_counter += 1
-    
-    output_dir = os.path.join(base_output_dir, f"batch_output_{batch_counter}")
-    os.makedirs(output_dir, exist_ok=True)
+    if args.resume and batch_counter > 1:
+        output_dir = os.path.join(base_output_dir, f"batch_output_{batch_counter - 1}")
+    else:
+        # Claim the directory atomically so concurrent runs never share (and overwrite) one
+        os.makedirs(base_output_dir, exist_ok=True)
+        while True:
+            output_dir = os.path.join(base_output_dir, f"batch_output_{batch_counter}")
+            try:
+                os.mkdir(output_dir)
+                break
+            except FileExistsError:
+                batch_counter += 1
     
     # Get all markdown files
     markdown_files = glob.glob(os.path.join(markdown_dir, "*.md"))
@@ -348,21 +432,42 @@ def main():
     enhanced_extractor = EnhancedClinicalExtractor()
     logger = get_logger(__name__)
     
-    # Process each markdown file
-    results = []
+    # Read and pre-validate every markdown file not already saved by an earlier run
     total_files = len(markdown_files)
-    
+    results = []
+    pending = []
     for i, markdown_path in enumerate(markdown_files, 1):
-        result = process_single_markdown(
-            markdown_path, output_dir, client, enhanced_extractor, 
-            total_files, i
-        )
+        checkpoint = load_checkpoint(markdown_path, output_dir) if args.resume else None
+        if checkpoint:
+            print(f"⏭️  [{i}/{total_files}] {os.path.basename(markdown_path)} already processed, skipping")
+            results.append(checkpoint)
+            continue
+        result, context = prepare_markdown(markdown_path, enhanced_extractor, total_files, i)
         results.append(result)
-        
-        # Brief pause between files
-        if i < total_files:
-            print(f"\n⏳ Waiting 2 seconds before next file...")
-            time.sleep(2)
+        if context is not None:
+            pending.append((i, result, context))
+    
+    # Send all focused prompts to the LLM concurrently; each response is parsed and saved
+    # (in a worker thread) as soon as it arrives, so an interrupted run can be continued with --resume
+    completed = 0
+    progress_lock = threading.Lock()
+    
+    def on_complete(index: int, raw_response: Optional[str], request_time: float) -> None:
+        nonlocal completed
+        i, result, context = pending[index]
+        finish_markdown(result, context, raw_response, request_time, output_dir, enhanced_extractor, total_files, i)
+        with progress_lock:
+            completed += 1
+            print_progress(completed, len(pending), llm_start_time)
+    
+    print(f"\n🔄 LLM Processing {len(pending)} files concurrently (this may take a few minutes)...")
+    llm_start_time = time.time()
+    if pending:
+        asyncio.run(client.chat_completions_batch(
+            [context["focused_messages"] for _, _, context in pending],
+            on_complete=on_complete
+        ))
+    print(f"✅ LLM processing completed in {time.time() - llm_start_time:.1f} seconds")
     
     # Generate summary report
     print(f"\n{'='*80}")
@@ -371,7 +476,8 @@ def main():
     
     successful = sum(1 for r in results if r["status"] == "success")
     failed = total_files - successful
-    total_time = sum(r["extraction_time"] for r in results)
+    # Files overlap while their requests are in flight, so report wall-clock time rather than a per-file sum
+    total_time = (datetime.now() - run_start).total_seconds()
     total_rows = sum(r["rows_generated"] for r in results if r["status"] == "success")
     
     # Get API usage summary
@@ -393,10 +499,10 @@ def main():
     client.print_usage_summary()
     
     if failed > 0:
-        print(f"\n❌ Failed files:")
-        for result in results:
-            if result["status"] == "failed":
-                print(f"   - {os.path.basename(result['markdown_file'])}: {result['error']}")
+        print("\n".join([f"\n❌ Failed files:"] + [
+            f"   - {os.path.basename(result['markdown_file'])}: {result['error']}"
+            for result in results if result["status"] == "failed"
+        ]))
     
     # Create combined CSV
     print(f"\n🔄 Creating combined CSV file...")
@@ -404,20 +510,19 @@ def main():
     
     # Save batch summary
     summary_file = os.path.join(output_dir, 'batch_summary.json')
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "batch_metadata": {
-                "processing_date": datetime.now().isoformat(),
-                "total_files": total_files,
-                "successful": successful,
-                "failed": failed,
-                "total_time": total_time,
-                "total_rows": total_rows,
-                "combined_csv": combined_csv_file if combined_csv_file else None
-            },
-            "api_usage": api_usage,
-            "results": results
-        }, f, indent=4, ensure_ascii=False)
+    write_json(summary_file, {
+        "batch_metadata": {
+            "processing_date": run_start.isoformat(),
+            "total_files": total_files,
+            "successful": successful,
+            "failed": failed,
+            "total_time": total_time,
+            "total_rows": total_rows,
+            "combined_csv": combined_csv_file if combined_csv_file else None
+        },
+        "api_usage": api_usage,
+        "results": results
+    })
     
     print(f"\n📄 Batch summary saved to: {os.path.basename(summary_file)}")
     if combined_csv_file:
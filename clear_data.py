@@ -1,7 +1,8 @@
 import os
 import shutil
 import logging
-import json
+
+from src.repository import clear_processed_files, ensure_tables
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,18 +22,10 @@ def safe_remove_file(path: str):
         logging.info(f"File not found, skipping: {path}")
 
 def create_processed_files():
-    """Create a fresh processed_files.json with empty tracking (clears processed file names)"""
-    processed_files = {
-        "processed_files": [],
-        "failed_files": [],
-        "last_processed": None,
-        "total_processed": 0,
-        "total_failed": 0
-    }
-    
-    with open('data/processed_files.json', 'w') as f:
-        json.dump(processed_files, f, indent=2)
-    logging.info("Cleared processed file names from tracking")
+    """Empty the ProcessedFiles table (clears processed file names)"""
+    # ensure_tables imports any legacy processed_files.json into a new table first, so it cannot come back later
+    ensure_tables()
+    clear_processed_files()
 
 def main():
     # Directories to clean (removed 'logs' to keep it)
@@ -51,7 +44,7 @@ def main():
     for f in temp_files:
         safe_remove_file(f)
 
-    # Create fresh processed_files.json instead of removing it
+    # Clear processed file tracking
     create_processed_files()
 
     logging.info("Cleanup complete.")
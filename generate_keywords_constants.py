@@ -0,0 +1,57 @@
+import argparse
+import json
+import logging
+import sys
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SOURCE_PATH = 'data/keywords_structure_full_pub.json'
+OUTPUT_PATH = 'src/keywords_constants.py'
+
+HEADER = '''"""
+Field lists from data/keywords_structure_full_pub.json as Python constants.
+
+Generated by generate_keywords_constants.py - do not edit by hand. Change the JSON
+file and rerun the script; `python generate_keywords_constants.py --check` verifies
+that the two are in sync.
+"""
+
+from typing import Tuple
+'''
+
+def render_constants(keywords: dict) -> str:
+    """Render the constants module for the given keywords structure."""
+    parts = [HEADER]
+    for name, key in (('SHARED_FIELDS', 'shared_fields'), ('ARM_SPECIFIC_FIELDS', 'arm_specific_fields')):
+        parts.append(f'\n{name}: Tuple[str, ...] = (\n')
+        parts.extend(f'    {json.dumps(field, ensure_ascii=False)},\n' for field in keywords[key])
+        parts.append(')\n')
+    return ''.join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Generate {OUTPUT_PATH} from {SOURCE_PATH}.')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if the generated file is out of date instead of writing it')
+    args = parser.parse_args()
+
+    with open(SOURCE_PATH, 'r', encoding='utf-8') as f:
+        expected = render_constants(json.load(f))
+
+    if args.check:
+        try:
+            with open(OUTPUT_PATH, 'r', encoding='utf-8') as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current != expected:
+            logging.error(f"{OUTPUT_PATH} is out of date; run: python generate_keywords_constants.py")
+            sys.exit(1)
+        logging.info(f"{OUTPUT_PATH} is in sync with {SOURCE_PATH}")
+        return
+
+    with open(OUTPUT_PATH, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(expected)
+    logging.info(f"Wrote {OUTPUT_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -30,13 +30,15 @@ class MarkerEnhancedPipeline:
     applies clinical trial data extraction.
     """
     
-    def __init__(self, use_llm: bool = False, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, use_llm: bool = False, config: Optional[Dict[str, Any]] = None,
+                 openai_client: Optional[OpenAIClient] = None):
         """
         Initialize the Marker-enhanced pipeline.
         
         Args:
             use_llm: Whether to use LLM enhancement for Marker processing
             config: Configuration dictionary
+            openai_client: Existing OpenAI client to reuse (a new one is created if omitted)
         """
         self.logger = get_logger(__name__)
         self.use_llm = use_llm
@@ -51,7 +53,7 @@ class MarkerEnhancedPipeline:
         )
         
         self.extractor = EnhancedClinicalExtractor()
-        self.openai_client = OpenAIClient()
+        self.openai_client = openai_client or OpenAIClient()
         self.excel_generator = ExcelGenerator()
         
         # Create output directories
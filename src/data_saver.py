@@ -4,7 +4,13 @@ import json
 import logging
 
 from src.logger_config import get_logger, log_performance
-from src.repository import insert_attribute, insert_drug, insert_drug_attribute, link_abstract_drug
+from src.repository import (
+    abstract_transaction,
+    insert_attribute,
+    insert_drug,
+    insert_drug_attributes_bulk,
+    link_abstract_drugs_bulk,
+)
 
 
 def save_response_to_db(abstract_id: int, json_response: str) -> None:
@@ -25,41 +31,43 @@ def save_response_to_db(abstract_id: int, json_response: str) -> None:
         print("No treatment arms found in the response.")
         return
 
-    for arm in treatment_arms:
-        # Get the drug name (Generic name)
-        drug_name = arm.get("Generic name")
-        if not drug_name:
-            print("Drug name missing in one of the entries. Skipping this arm.")
-            continue
+    # All writes for this abstract share one transaction (and one commit)
+    with abstract_transaction():
+        # Rows are collected for all arms and written with one bulk insert per table
+        abstract_drug_rows = []
+        drug_attribute_rows = []
+        for arm in treatment_arms:
+            # Get the drug name (Generic name)
+            drug_name = arm.get("Generic name")
+            if not drug_name:
+                print("Drug name missing in one of the entries. Skipping this arm.")
+                continue
 
-        # Insert the drug into the Drugs table and get the drug_id
-        drug_id = insert_drug(drug_name)
+            # Insert the drug into the Drugs table and get the drug_id
+            drug_id = insert_drug(drug_name)
 
-        # Link the abstract to the drug
-        link_abstract_drug(abstract_id, drug_id)
+            # Link the abstract to the drug
+            abstract_drug_rows.append((abstract_id, drug_id))
 
-        # Process all attributes from the treatment arm
-        for attr_name, attr_value in arm.items():
-            if attr_name == "Generic name":  # Skip the drug name as it's already processed
-                continue
+            # Process all attributes from the treatment arm
+            for attr_name, attr_value in arm.items():
+                if attr_name == "Generic name":  # Skip the drug name as it's already processed
+                    continue
 
-            if not attr_name or attr_value is None:
-                print(f"Missing attribute name or value for drug '{drug_name}'. Skipping this attribute.")
-                continue
+                if not attr_name or attr_value is None:
+                    print(f"Missing attribute name or value for drug '{drug_name}'. Skipping this attribute.")
+                    continue
 
-            # Insert the attribute into the Attributes table and get the attribute_id
-            attribute_id = insert_attribute(attr_name)
+                # Insert the attribute into the Attributes table and get the attribute_id
+                attribute_id = insert_attribute(attr_name)
 
-            # Insert the drug attribute into the DrugAttributes table
-            insert_drug_attribute(
-                drug_id=drug_id,
-                attribute_id=attribute_id,
-                abstract_id=abstract_id,
-                attribute_value=str(attr_value),
-                attribute_units=None,  # We don't have units in the current structure
-            )
+                # Queue the drug attribute for the DrugAttributes table
+                # (we don't have units in the current structure)
+                drug_attribute_rows.append((drug_id, attribute_id, abstract_id, str(attr_value), None))
 
-            print(f"Saved attribute '{attr_name}' for drug '{drug_name}'.")
+        link_abstract_drugs_bulk(abstract_drug_rows)
+        insert_drug_attributes_bulk(drug_attribute_rows)
+        print(f"Saved {len(drug_attribute_rows)} attributes for {len(abstract_drug_rows)} drugs.")
 
     print("All data from the JSON response has been saved to the database.")
 
@@ -1,130 +1,24 @@
 import json
 import re
 import logging
+import copy
+import hashlib
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import os
 
-class EnhancedClinicalExtractor:
-    """
-    Enhanced clinical trial data extractor with three-stage architecture:
-    1. Pre-validation
-    2. Focused extraction  
-    3. Post-processing validation
-    """
-    
-    def __init__(self, keywords_file: str = "data/keywords_structure_enhanced.json"):
-        self.logger = logging.getLogger(__name__)
-        self.keywords_structure = self._load_keywords_structure(keywords_file)
-        self.validation_rules = self.keywords_structure.get("validation_rules", {})
-        self.controlled_vocabularies = self.validation_rules.get("controlled_vocabularies", {})
-        
-    def _load_keywords_structure(self, keywords_file: str) -> Dict[str, Any]:
-        """Load the enhanced keywords structure"""
-        try:
-            with open(keywords_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            self.logger.error(f"Keywords file not found: {keywords_file}")
-            return {}
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in keywords file: {e}")
-            return {}
-    
-    def pre_validate(self, publication_text: str) -> Tuple[bool, Dict[str, Any]]:
-        """
-        Stage 1: Pre-validation
-        Validate critical fields and determine if publication can be processed
-        """
-        self.logger.info("Starting pre-validation...")
-        
-        validation_result = {
-            "can_process": False,
-            "nct_number": None,
-            "treatment_arms_count": 0,
-            "errors": [],
-            "warnings": []
-        }
-        
-        # Check for NCT number (critical field)
-        nct_patterns = self.validation_rules.get("critical_fields", {}).get("nct_number", {}).get("extraction_patterns", [])
-        nct_found = False
-        
-        for pattern in nct_patterns:
-            matches = re.findall(pattern, publication_text, re.IGNORECASE)
-            if matches:
-                validation_result["nct_number"] = matches[0]
-                nct_found = True
-                break
-        
-        if not nct_found:
-            validation_result["errors"].append("No NCT number found - cannot process")
-            return False, validation_result
-        
-        # Count treatment arms with improved detection patterns
-        arm_indicators = [
-            r"arm\s+\d+",
-            r"group\s+\d+", 
-            r"cohort\s+\d+",
-            r"treatment\s+arm",
-            r"dose\s+level"
-        ]
-        
-        arm_count = 0
-        for pattern in arm_indicators:
-            matches = re.findall(pattern, publication_text, re.IGNORECASE)
-            arm_count = max(arm_count, len(matches))
-        
-        # If no arms found with basic patterns, try more sophisticated detection
-        if arm_count == 0:
-            # Look for treatment assignments with patient counts in methods section
-            treatment_patterns = [
-                r"(\w+)\s+every\s+\d+\s+weeks?\s*\(n=\d+\)",
-                r"(\w+)\s*\(n=\d+\)",
-                r"(\w+)\s+group\s*\(n=\d+\)"
-            ]
-            
-            unique_treatments = set()
-            for pattern in treatment_patterns:
-                matches = re.findall(pattern, publication_text, re.IGNORECASE)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        treatment_name = match[0].lower()
-                        # Filter out common non-treatment words
-                        if treatment_name not in ['the', 'and', 'or', 'with', 'for', 'in', 'on', 'at', 'to', 'of', 'a', 'an']:
-                            unique_treatments.add(treatment_name)
-                    else:
-                        treatment_name = match.lower()
-                        if treatment_name not in ['the', 'and', 'or', 'with', 'for', 'in', 'on', 'at', 'to', 'of', 'a', 'an']:
-                            unique_treatments.add(treatment_name)
-            
-            # Cap the arm count at a reasonable number (most trials have 1-6 arms)
-            arm_count = min(len(unique_treatments), 6)
-        
-        validation_result["treatment_arms_count"] = arm_count
-        validation_result["can_process"] = True
-        
-        self.logger.info(f"Pre-validation complete: NCT={validation_result['nct_number']}, Arms={arm_count}")
-        return True, validation_result
-    
-    def create_focused_prompt(self, publication_text: str, validation_data: Dict[str, Any]) -> str:
-        """
-        Stage 2: Create focused extraction prompt
-        Generate comprehensive prompt based on enhanced keywords structure
-        """
-        nct_number = validation_data.get("nct_number", "")
-        arm_count = validation_data.get("treatment_arms_count", 0)
-        
-        # Generate comprehensive field list from keywords structure
-        shared_fields = self._get_shared_fields()
-        arm_fields = self._get_arm_fields()
-        
-        prompt = f"""
-TASK: Extract comprehensive clinical trial data from this publication.
+# Maximum number of publications whose pre-validation/prompt results are memoized; each
+# entry holds a focused prompt of up to ~60K characters, so keep this small
+PROMPT_CACHE_SIZE = 32
+
+# Static extraction instructions, sent as the system message ahead of the publication so
+# every request shares the same long prefix and is eligible for OpenAI prompt caching
+FOCUSED_SYSTEM_PROMPT = """TASK: Extract comprehensive clinical trial data from a publication.
 
 CRITICAL REQUIREMENTS:
-1. NCT number: {nct_number} (already validated)
-2. Expected treatment arms: {arm_count}
+1. Use the NCT number given with the publication (already validated)
+2. Extract the expected number of treatment arms given with the publication
 3. Output raw JSON only (no markdown, no explanations)
 4. Extract ONLY explicit information - never infer or guess
 5. Use empty string "" for missing values
@@ -141,8 +35,8 @@ DATA FORMATS:
 - Missing: Use ""
 
 COMPREHENSIVE JSON STRUCTURE:
-{{
-  "NCT Number": "{nct_number}",
+{
+  "NCT Number": "validated NCT number given with the publication",
   "Publication name": "Journal YYYY; Volume:Pages",
   "Publication Year": "YYYY",
   "PDF number": "filename",
@@ -170,7 +64,7 @@ COMPREHENSIVE JSON STRUCTURE:
   "Trial run in US": "YES/NO",
   "Trial run in China": "YES/NO",
   "treatment_arms": [
-    {{
+    {
       "Generic name": "Drug name or Drug A + Drug B",
       "Brand name": "text",
       "Line of Treatment": "Neoadjuvant/First Line/2nd Line/3rd Line+",
@@ -274,9 +168,9 @@ COMPREHENSIVE JSON STRUCTURE:
       "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Bleeding": "percentage",
       "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pruritus": "percentage",
       "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Rash": "percentage"
-    }}
+    }
   ]
-}}
+}
 
 EXTRACTION INSTRUCTIONS:
 1. Extract ALL fields listed above that are explicitly mentioned in the publication
@@ -285,13 +179,160 @@ EXTRACTION INSTRUCTIONS:
 4. For binary fields: use "YES" or "NO" only
 5. For missing data: use empty string ""
 6. For survival data with "not reached": use "NR"
+"""
+
+class EnhancedClinicalExtractor:
+    """
+    Enhanced clinical trial data extractor with three-stage architecture:
+    1. Pre-validation
+    2. Focused extraction  
+    3. Post-processing validation
+    """
+    
+    def __init__(self, keywords_file: str = "data/keywords_structure_enhanced.json"):
+        self.logger = logging.getLogger(__name__)
+        self.keywords_structure = self._load_keywords_structure(keywords_file)
+        self.validation_rules = self.keywords_structure.get("validation_rules", {})
+        self.controlled_vocabularies = self.validation_rules.get("controlled_vocabularies", {})
+        # LRU cache of text digest -> (can_process, validation_data, focused_messages)
+        self._prompt_cache: "OrderedDict[bytes, Tuple[bool, Dict[str, Any], Optional[List[Dict[str, str]]]]]" = OrderedDict()
+        
+    def _load_keywords_structure(self, keywords_file: str) -> Dict[str, Any]:
+        """Load the enhanced keywords structure"""
+        try:
+            with open(keywords_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.logger.error(f"Keywords file not found: {keywords_file}")
+            return {}
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON in keywords file: {e}")
+            return {}
+    
+    def pre_validate(self, publication_text: str) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Stage 1: Pre-validation
+        Validate critical fields and determine if publication can be processed
+        """
+        self.logger.info("Starting pre-validation...")
+        
+        validation_result = {
+            "can_process": False,
+            "nct_number": None,
+            "treatment_arms_count": 0,
+            "errors": [],
+            "warnings": []
+        }
+        
+        # Check for NCT number (critical field)
+        nct_patterns = self.validation_rules.get("critical_fields", {}).get("nct_number", {}).get("extraction_patterns", [])
+        nct_found = False
+        
+        for pattern in nct_patterns:
+            matches = re.findall(pattern, publication_text, re.IGNORECASE)
+            if matches:
+                validation_result["nct_number"] = matches[0]
+                nct_found = True
+                break
+        
+        if not nct_found:
+            validation_result["errors"].append("No NCT number found - cannot process")
+            return False, validation_result
+        
+        # Count treatment arms with improved detection patterns
+        arm_indicators = [
+            r"arm\s+\d+",
+            r"group\s+\d+", 
+            r"cohort\s+\d+",
+            r"treatment\s+arm",
+            r"dose\s+level"
+        ]
+        
+        arm_count = 0
+        for pattern in arm_indicators:
+            matches = re.findall(pattern, publication_text, re.IGNORECASE)
+            arm_count = max(arm_count, len(matches))
+        
+        # If no arms found with basic patterns, try more sophisticated detection
+        if arm_count == 0:
+            # Look for treatment assignments with patient counts in methods section
+            treatment_patterns = [
+                r"(\w+)\s+every\s+\d+\s+weeks?\s*\(n=\d+\)",
+                r"(\w+)\s*\(n=\d+\)",
+                r"(\w+)\s+group\s*\(n=\d+\)"
+            ]
+            
+            unique_treatments = set()
+            for pattern in treatment_patterns:
+                matches = re.findall(pattern, publication_text, re.IGNORECASE)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        treatment_name = match[0].lower()
+                        # Filter out common non-treatment words
+                        if treatment_name not in ['the', 'and', 'or', 'with', 'for', 'in', 'on', 'at', 'to', 'of', 'a', 'an']:
+                            unique_treatments.add(treatment_name)
+                    else:
+                        treatment_name = match.lower()
+                        if treatment_name not in ['the', 'and', 'or', 'with', 'for', 'in', 'on', 'at', 'to', 'of', 'a', 'an']:
+                            unique_treatments.add(treatment_name)
+            
+            # Cap the arm count at a reasonable number (most trials have 1-6 arms)
+            arm_count = min(len(unique_treatments), 6)
+        
+        validation_result["treatment_arms_count"] = arm_count
+        validation_result["can_process"] = True
+        
+        self.logger.info(f"Pre-validation complete: NCT={validation_result['nct_number']}, Arms={arm_count}")
+        return True, validation_result
+    
+    def create_focused_messages(self, publication_text: str, validation_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Stage 2: Create focused extraction messages
+        The static instructions go in the system message; the trial-specific facts and
+        the publication text follow in the user message
+        """
+        nct_number = validation_data.get("nct_number", "")
+        arm_count = validation_data.get("treatment_arms_count", 0)
+        
+        user_prompt = f"""NCT number: {nct_number} (already validated)
+Expected treatment arms: {arm_count}
 
 PUBLICATION TEXT:
-{publication_text[:60000]}  # Increased text length for comprehensive extraction
+{publication_text[:60000]}
 
 Return JSON only:"""
         
-        return prompt
+        return [
+            {"role": "system", "content": FOCUSED_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+    
+    def prepare_extraction(self, publication_text: str) -> Tuple[bool, Dict[str, Any], Optional[List[Dict[str, str]]]]:
+        """
+        Run pre-validation and build the focused messages, memoized by text digest.
+
+        Re-processing the same publication (retries, batch reruns) skips both stages.
+        Only the prompt and validation data are cached, never the LLM response. Callers
+        get their own copies, so mutating them does not change the cached entry.
+
+        Returns:
+            Tuple of (can_process, validation_data, focused_messages or None)
+        """
+        key = hashlib.blake2b(publication_text.encode("utf-8"), digest_size=16).digest()
+        cached = self._prompt_cache.get(key)
+        if cached is not None:
+            self._prompt_cache.move_to_end(key)
+            self.logger.debug("Using cached pre-validation and focused prompt")
+            return copy.deepcopy(cached)
+        
+        can_process, validation_data = self.pre_validate(publication_text)
+        focused_messages = self.create_focused_messages(publication_text, validation_data) if can_process else None
+        
+        result = (can_process, validation_data, focused_messages)
+        self._prompt_cache[key] = result
+        if len(self._prompt_cache) > PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
+        return copy.deepcopy(result)
     
     def _get_shared_fields(self) -> List[str]:
         """Get list of shared fields from keywords structure"""
@@ -440,21 +481,18 @@ Return JSON only:"""
         """
         Complete extraction pipeline with validation
         """
-        # Stage 1: Pre-validation
-        can_process, validation_data = self.pre_validate(publication_text)
+        # Stages 1-2: Pre-validation and focused prompt (cached per publication)
+        can_process, validation_data, messages = self.prepare_extraction(publication_text)
         if not can_process:
             return {
                 "error": "Publication failed pre-validation",
                 "validation_data": validation_data
             }
         
-        # Stage 2: Create focused prompt
-        prompt = self.create_focused_prompt(publication_text, validation_data)
-        
         # Stage 3: Extract data (this would be done by LLM)
-        # For now, return the prompt for external processing
+        # For now, return the messages for external processing
         return {
-            "prompt": prompt,
+            "messages": messages,
             "validation_data": validation_data,
             "extraction_ready": True
         } 
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Field lists from data/keywords_structure_full_pub.json as Python constants.
+
+Generated by generate_keywords_constants.py - do not edit by hand. Change the JSON
+file and rerun the script; `python generate_keywords_constants.py --check` verifies
+that the two are in sync.
+"""
+
+from typing import Tuple
+
+SHARED_FIELDS: Tuple[str, ...] = (
+    "Publication Name",
+    "Publication Year",
+    "PDF number",
+    "Trial name",
+    "Cancer Type",
+    "Sponsors",
+    "Clinical Trial Phase",
+    "NCT Number",
+    "Mechanism of action",
+    "Target Protein",
+    "Type of therapy",
+    "Dosage",
+    "Type of dosing",
+    "Number of doses per year",
+    "Primary endpoint",
+    "Secondary endpoint",
+    "Median Age",
+    "Biomarker Inclusion",
+    "Biomarkers Inclusion Criteria",
+    "Biomarkers Exclusion Criteria",
+    "Major country where clinical trial is conducted",
+    "Study start date",
+    "Study completion date",
+    "First results",
+    "Trial run in Europe",
+    "Trial run in US",
+    "Trial run in China",
+)
+
+ARM_SPECIFIC_FIELDS: Tuple[str, ...] = (
+    "Generic name",
+    "Brand name",
+    "Company EU",
+    "Company US",
+    "Company China",
+    "Chemotherapy Naive",
+    "Chemotherapy Failed",
+    "Immune Checkpoint Inhibitor (ICI) Naive",
+    "Immune Checkpoint Inhibitor (ICI) failed",
+    "Ipilimumab-failure or Ipilimumab-refractory",
+    "Anti PD-1/L1-failure or Anti PD-1/L1-refractory",
+    "Mutation status",
+    "BRAF-mutation",
+    "NRAS-Mutation",
+    "Biosimilar",
+    "Line of Treatment",
+    "Objective response rate (ORR)",
+    "Complete Response (CR)",
+    "Pathological Complete Response (pCR)",
+    "Complete Metabolic Response (CMR)",
+    "Disease Control Rate or DCR",
+    "Clinical Benefit Rate (CBR)",
+    "Duration of Response (DOR) rate",
+    "Progression free survival (PFS) rate at 6 months",
+    "Progression free survival (PFS) rate at 9 months",
+    "Progression free survival (PFS) rate at 12 months",
+    "Progression free survival (PFS) rate at 18 months",
+    "Progression free survival (PFS) rate at 24 months",
+    "Progression free survival (PFS) rate at 48 months",
+    "Overall survival (OS) rate at 6 months",
+    "Overall survival (OS) rate at 9 months",
+    "Overall survival (OS) rate at 12 months",
+    "Overall survival (OS) rate at 18 months",
+    "Overall survival (OS) rate at 24 months",
+    "Overall survival (OS) rate at 48 months",
+    "Number of patients",
+    "Median Progression free survival (PFS)",
+    "Length of measuring PFS",
+    "p-value of PFS",
+    "Hazard ratio (HR) PFS",
+    "Median Overall survival (OS)",
+    "Length of measuring OS",
+    "p-value of OS",
+    "Hazard ratio (HR) OS",
+    "Event-Free Survival (EFS)",
+    "p-value of EFS",
+    "Hazard ratio (HR) EFS",
+    "Recurrence-Free Survival (RFS)",
+    "p-value of RFS",
+    "Length of measuring RFS",
+    "Hazard ratio (HR) RFS",
+    "Metastasis-Free Survival (MFS)",
+    "Length of measuring MFS",
+    "Hazard ratio (HR) MFS",
+    "Time to response (TTR)",
+    "Time to Progression (TTP)",
+    "Time to Next Treatment (TTNT)",
+    "Time to Treatment Failure (TTF)",
+    "Median Duration of response or DOR",
+    "Adverse events (AE)",
+    "Treatment emergent adverse events (TEAE)",
+    "Treatment-related adverse events (TRAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment emergent adverse events (TEAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-related adverse events (TRAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-emergent adverse events (TEAE)",
+    "Grade 4 treatment emergent adverse events",
+    "Grade 5 treatment emergent adverse events",
+    "Immune related adverse events (irAEs)",
+    "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
+    "Adverse events (AEs) leading to discontinuation",
+    "Treatment-emergent adverse events (TEAE) led to death",
+    "Adverse Events leading to death",
+    "Serious Adverse Events (SAE)",
+    "Serious treatment emergent adverse events",
+    "Serious treatment related adverse events",
+    "Cytokine Release Syndrome or CRS",
+    "White blood cell (WBC) decreased",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Immune related adverse events (irAEs)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Cytokine Release Syndrome or CRS",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Thrombocytopenia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Neutropenia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Leukopenia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Nausea",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Anemia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Diarrhea",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Colitis",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Hyperglycemia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Neutrophil count decreased",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Constipation",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Dyspnea",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Cough",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pyrexia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Bleeding",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pruritus",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Rash",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pneumonia",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Thyroiditis",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Hypophysitis",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Hepatitis",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pneumonitis",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Alanine aminotransferase",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 White blood cell (WBC) decreased",
+)
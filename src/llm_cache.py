@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import orjson
+
+from src.logger_config import get_logger
+
+DEFAULT_CACHE_DIR = os.path.join("data", "llm_cache")
+
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache for LLM responses.
+
+    Entries are stored as data/llm_cache/<first two hex chars>/<sha256>.json together
+    with the model name and a UTC timestamp, so repeated runs over the same inputs
+    skip the API call entirely.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Parameters:
+            cache_dir (str): Directory holding the cache entries
+        """
+        self.logger = get_logger(__name__)
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Build a cache key from the given parts (e.g. model, prompt version, input text).
+
+        Each part is prefixed with its 8-byte length so that different splits of the
+        same characters (("ab", "c") vs ("a", "bc")) never hash to the same key.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part.encode("utf-8")
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached value for key, or None on a miss.
+
+        Unreadable or malformed entries are evicted and treated as misses.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = orjson.loads(f.read())
+            return entry["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Evicting unreadable cache entry {path}: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], model: Optional[str] = None) -> None:
+        """Store value under key; the write is atomic so readers never see a partial entry."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "model": model,
+            "value": value,
+        }
+        # A unique temp file per write, so concurrent writers (threads or processes) never share one;
+        # orjson serializes straight to UTF-8 bytes, so the text-layer encode pass is skipped
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            f.write(orjson.dumps(entry))
+        os.replace(f.name, path)
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for key if present."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
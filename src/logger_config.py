@@ -5,14 +5,19 @@ from datetime import datetime
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, f"clinical_trial_extraction_{datetime.now().strftime('%Y%m%d')}.log")
 
+_FILE_HANDLER_NAME = "clinical_trial_file"
+
 # Ensure log directory exists
 os.makedirs(LOG_DIR, exist_ok=True)
 
 def setup_logging():
     """
-    Set up logging to both file and console. Avoid duplicate handlers.
+    Set up logging to both file and console, once per process. Avoid duplicate handlers.
     """
     logger = logging.getLogger()
+    # get_logger() runs this for every logger; only the first call configures the handlers
+    if any(handler.get_name() == _FILE_HANDLER_NAME for handler in logger.handlers):
+        return
     logger.setLevel(logging.INFO)
 
     # Remove all handlers if already set (avoid duplicate logs)
@@ -24,6 +29,7 @@ def setup_logging():
     file_handler.setLevel(logging.INFO)
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_formatter)
+    file_handler.set_name(_FILE_HANDLER_NAME)
     logger.addHandler(file_handler)
 
     # Console handler
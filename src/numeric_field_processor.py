@@ -2,8 +2,9 @@
 Post-processing module for cleaning numeric fields from LLM output.
 """
 
+import itertools
 import re
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -330,13 +331,22 @@ def clean_numeric_field(field_name: str, value: Any) -> str:
     # For non-numeric fields, return as-is
     return value
 
-def process_treatment_arm(arm_data: Dict[str, Any]) -> Dict[str, Any]:
+def process_treatment_arm(arm_data: Dict[str, Any], updates: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Process all numeric and p-value fields in a treatment arm.
+
+    Values in updates replace (or are added to) the arm's values before processing,
+    without copying the arm dict first.
     """
     processed_arm = {}
-    
-    for field_name, value in arm_data.items():
+    items = arm_data.items()
+    if updates:
+        items = itertools.chain(
+            ((field_name, updates.get(field_name, value)) for field_name, value in arm_data.items()),
+            ((field_name, value) for field_name, value in updates.items() if field_name not in arm_data),
+        )
+    
+    for field_name, value in items:
         if is_p_value_field(field_name):
             processed_arm[field_name] = classify_p_value_significance(value)
             logger.debug(f"Processed p-value field '{field_name}': '{value}' -> '{processed_arm[field_name]}'")
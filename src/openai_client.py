@@ -1,22 +1,65 @@
 # openai_client.py
 
-import json
+import asyncio
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
+import httpx
+import orjson
 import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from src.llm_cache import LLMCache
 from src.logger_config import get_logger, log_performance
-from src.prompts_pub import generate_arm_aware_prompt
+from src.prompts_pub import generate_arm_aware_messages
 from src.post_processor import process_extracted_data
+from src.text_preprocessor import has_nct_number
 
 # Load environment variables
 load_dotenv()
 
 # KEYWORDS_STRUCTURE is no longer needed here, it's handled by the prompt generator.
 
+# JSON mode for arm-aware extraction. A strict json_schema would have to pin every
+# field name and forbid the empty {} returned when no NCT number is found, so the
+# API is only asked to guarantee syntactically valid JSON here.
+ARM_AWARE_RESPONSE_FORMAT = {"type": "json_object"}
+
+# JSON repair patterns used by _robust_parse_json
+_TRAILING_COMMA_RX = re.compile(r",\s*([\}\]])")
+_TREATMENT_ARMS_RX = re.compile(r'"treatment_arms"\s*:\s*\[')
+
+# Maximum number of chat completions in flight in chat_completions_batch
+CHAT_BATCH_CONCURRENCY = 8
+
+# Connection pool sized for concurrent batches (the SDK default can raise PoolTimeout).
+# Extraction completions can run for minutes, so only the connect timeout is tightened.
+CHAT_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+CHAT_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+# Retries on rate limits (429), 5xx, timeouts and connection errors; the SDK backs off
+# exponentially with jitter between attempts
+CHAT_MAX_RETRIES = 5
+
+# Set LLM_RESPONSE_CACHE=0 to always call the API instead of reusing cached responses
+RESPONSE_CACHE_ENV = "LLM_RESPONSE_CACHE"
+
+@lru_cache(maxsize=None)
+def _shared_client(api_key: str) -> OpenAI:
+    """One OpenAI client (and HTTP connection pool) per API key, shared by all OpenAIClient instances."""
+    return OpenAI(
+        api_key=api_key,
+        base_url="https://api.openai.com/v1",
+        timeout=CHAT_HTTP_TIMEOUT,
+        max_retries=CHAT_MAX_RETRIES,
+        http_client=httpx.Client(limits=CHAT_HTTP_LIMITS),
+    )
+
 def calculate_cost(prompt_tokens, completion_tokens):
     # Rates per 1K tokens for 'gpt-4o-mini'
     rate_per_1k_prompt_tokens = 0.00015
@@ -29,40 +72,162 @@ def calculate_cost(prompt_tokens, completion_tokens):
 
 
 class OpenAIClient:
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMCache] = None, use_cache: Optional[bool] = None):
+        """
+        Parameters:
+            cache (Optional[LLMCache]): Chat completion response cache (defaults to data/llm_cache)
+            use_cache (Optional[bool]): Whether to read and write the response cache
+                (defaults to the LLM_RESPONSE_CACHE environment variable, on unless set to 0)
+        """
         self.logger = get_logger(__name__)
         self.logger.info("OpenAIClient initialized")
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             self.logger.critical("OPENAI_API_KEY environment variable is not set")
             raise ValueError("OPENAI_API_KEY is not set")
-        self.client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
+        self.client = _shared_client(api_key)
         self.model = "gpt-4o-mini"
         self.max_tokens = 8000
+        try:
+            self._encoding = tiktoken.encoding_for_model(self.model)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("o200k_base")
         self.total_cost = 0.0
         self.total_prompt_tokens = 0
         self.total_completion_tokens = 0
         self.request_count = 0
+        if use_cache is None:
+            use_cache = os.getenv(RESPONSE_CACHE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+        self.cache = (cache or LLMCache()) if use_cache else None
+
+    def _cache_key(self, messages, max_tokens, response_format) -> str:
+        """Response cache key; requests run at temperature 0, so equal parameters give equal answers."""
+        return LLMCache.make_key(
+            "chat", self.model, str(max_tokens),
+            orjson.dumps(response_format).decode(), orjson.dumps(messages).decode(),
+        )
+
+    def _cached_completion(self, cache_key) -> Optional[str]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if isinstance(cached, dict) and isinstance(cached.get("content"), str):
+            self.logger.info("Chat completion served from cache.")
+            return cached["content"]
+        if cached is not None:
+            self.cache.delete(cache_key)
+        return None
+
+    def _store_completion(self, cache_key, response_message) -> None:
+        """Cache a response, but only one that parses as JSON, so truncated or malformed output is requested again."""
+        if self.cache is None or not response_message:
+            return
+        try:
+            orjson.loads(response_message)
+        except orjson.JSONDecodeError:
+            self.logger.warning("Not caching a chat completion that is not valid JSON.")
+            return
+        self.cache.set(cache_key, {"content": response_message}, model=self.model)
+
+    def get_chat_completion(self, messages, max_tokens=8000, response_format=None) -> str:
+        cache_key = self._cache_key(messages, max_tokens, response_format)
+        cached = self._cached_completion(cache_key)
+        if cached is not None:
+            return cached
 
-    def get_chat_completion(self, messages, max_tokens=8000) -> str:
         prompt_tokens = self.num_tokens_from_messages(messages)
         estimated_cost = calculate_cost(prompt_tokens, max_tokens)
-        self.logger.info(f"Estimated cost for this request: ${estimated_cost:.6f}")
+        self.logger.info("Estimated cost for this request: $%.6f", estimated_cost)
 
         completion = self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             max_tokens=max_tokens,
             temperature=0.0, # Set to 0.0 for maximum fact-based extraction
+            **({"response_format": response_format} if response_format else {}),
         )
         response_message = completion.choices[0].message.content
         usage = completion.usage
         actual_cost = calculate_cost(usage.prompt_tokens, usage.completion_tokens)
-        self.logger.info(f"Actual cost for this request: ${actual_cost:.6f}")
+        self.logger.info("Actual cost for this request: $%.6f", actual_cost)
+        self._log_cached_tokens(usage)
 
         self._update_totals(usage.prompt_tokens, usage.completion_tokens, actual_cost)
+        self._store_completion(cache_key, response_message)
         return response_message
 
+    async def _aget_chat_completion(self, async_client: AsyncOpenAI, messages, max_tokens=8000, response_format=None) -> str:
+        """Async counterpart of get_chat_completion, sent through async_client."""
+        cache_key = self._cache_key(messages, max_tokens, response_format)
+        cached = self._cached_completion(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt_tokens = self.num_tokens_from_messages(messages)
+        estimated_cost = calculate_cost(prompt_tokens, max_tokens)
+        self.logger.info("Estimated cost for this request: $%.6f", estimated_cost)
+
+        completion = await async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.0,
+            **({"response_format": response_format} if response_format else {}),
+        )
+        response_message = completion.choices[0].message.content
+        usage = completion.usage
+        actual_cost = calculate_cost(usage.prompt_tokens, usage.completion_tokens)
+        self.logger.info("Actual cost for this request: $%.6f", actual_cost)
+        self._log_cached_tokens(usage)
+
+        self._update_totals(usage.prompt_tokens, usage.completion_tokens, actual_cost)
+        self._store_completion(cache_key, response_message)
+        return response_message
+
+    async def chat_completions_batch(self, messages_list: List[List[Dict[str, str]]], max_tokens=8000,
+                                     response_format=None, concurrency_limit: int = CHAT_BATCH_CONCURRENCY,
+                                     on_complete: Optional[Callable[[int, Optional[str], float], None]] = None) -> List[Optional[str]]:
+        """
+        Run several independent chat completions concurrently.
+
+        Parameters:
+            messages_list (List[List[Dict[str, str]]]): One messages list per request
+            max_tokens (int): Completion token limit for each request
+            response_format (dict): Optional response_format for each request
+            concurrency_limit (int): Maximum number of requests in flight
+            on_complete (Callable): Optional callback(index, response, request_time) run as each request
+                finishes, so callers can persist results before the whole batch is done. request_time is
+                the seconds from sending the request to its response. The callback runs in a worker
+                thread so it does not stall other in-flight requests.
+
+        Returns:
+            List[Optional[str]]: Response content per request, in input order (None where the request failed)
+        """
+        semaphore = asyncio.Semaphore(concurrency_limit)
+
+        async def complete_one(index, messages):
+            async with semaphore:
+                sent_at = time.monotonic()
+                try:
+                    response = await self._aget_chat_completion(async_client, messages, max_tokens=max_tokens,
+                                                                response_format=response_format)
+                except Exception as e:
+                    self.logger.error("Chat completion %d failed: %s", index, e, exc_info=True)
+                    response = None
+                request_time = time.monotonic() - sent_at
+            if on_complete:
+                await asyncio.to_thread(on_complete, index, response, request_time)
+            return response
+
+        # Async connections belong to the event loop that opened them, so each batch opens
+        # its own client and closes it when the batch is done
+        async with AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url,
+                               timeout=CHAT_HTTP_TIMEOUT, max_retries=CHAT_MAX_RETRIES,
+                               http_client=httpx.AsyncClient(limits=CHAT_HTTP_LIMITS)) as async_client:
+            responses = await asyncio.gather(*(complete_one(i, messages) for i, messages in enumerate(messages_list)))
+        self.logger.info("Chat completion batch finished: %d/%d successful", sum(r is not None for r in responses), len(responses))
+        return responses
+
     @log_performance
     def extract_publication_data(self, full_text: str) -> Optional[Dict[str, Any]]:
         """
@@ -75,41 +240,49 @@ class OpenAIClient:
             self.logger.error("Extraction skipped: The provided text is empty.")
             return None
 
-        prompt = generate_arm_aware_prompt(full_text)
+        # An NCT number is mandatory; without one the model would only return {}
+        if not has_nct_number(full_text):
+            self.logger.error("Extraction skipped: No NCT number found in the text.")
+            return None
+
+        # Static instructions go in the system message so their prefix is cached across calls
+        messages = generate_arm_aware_messages(full_text)
         
         try:
-            response_content = self.get_chat_completion([{"role": "user", "content": prompt}])
+            response_content = self.get_chat_completion(messages, response_format=ARM_AWARE_RESPONSE_FORMAT)
             parsed_data = self._parse_json_response(response_content)
             if parsed_data and "treatment_arms" in parsed_data:
                 # Apply comprehensive post-processing (includes all validation and formatting)
                 processed_data = process_extracted_data(parsed_data, full_text)
-                self.logger.info(f"Extraction successful. Found {len(processed_data['treatment_arms'])} treatment arms.")
+                self.logger.info("Extraction successful. Found %d treatment arms.", len(processed_data["treatment_arms"]))
                 return processed_data
             else:
                 self.logger.error("Extraction failed: The returned JSON is missing the 'treatment_arms' key or is invalid.")
                 return None
         except Exception as e:
-            self.logger.error(f"An error occurred during extraction: {e}", exc_info=True)
+            self.logger.error("An error occurred during extraction: %s", e, exc_info=True)
             return None
 
     def num_tokens_from_messages(self, messages):
-        try:
-            encoding = tiktoken.encoding_for_model(self.model)
-        except KeyError:
-            encoding = tiktoken.get_encoding("o200k_base")
-        
         tokens_per_message = 3
         tokens_per_name = 1
         num_tokens = 0
         for message in messages:
             num_tokens += tokens_per_message
             for key, value in message.items():
-                num_tokens += len(encoding.encode(value))
+                num_tokens += len(self._encoding.encode(value))
                 if key == "name":
                     num_tokens += tokens_per_name
         num_tokens += 3
         return num_tokens
 
+    def _log_cached_tokens(self, usage) -> None:
+        """Log how many prompt tokens were served from the API's prompt cache."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if cached_tokens is not None:
+            self.logger.info("Cached prompt tokens: %d of %d", cached_tokens, usage.prompt_tokens)
+
     def _update_totals(self, prompt_tokens: int, completion_tokens: int, cost: float):
         self.total_prompt_tokens += prompt_tokens
         self.total_completion_tokens += completion_tokens
@@ -142,28 +315,34 @@ class OpenAIClient:
             self.logger.error("Could not find a valid JSON object within the response string.")
             return None
 
-        # 3. Fix trailing commas in objects and arrays
+        # 3. Fast path: most responses are already well-formed JSON
+        try:
+            parsed = orjson.loads(json_string)
+            if "treatment_arms" in parsed:
+                return parsed
+        except orjson.JSONDecodeError:
+            pass
+
+        # 4. Fix trailing commas in objects and arrays
         # This is a common LLM error.
-        import re
-        json_string = re.sub(r",\s*([\}\]])", r"\1", json_string)
+        json_string = _TRAILING_COMMA_RX.sub(r"\1", json_string)
 
-        # 4. Attempt to parse the cleaned string
+        # 5. Attempt to parse the cleaned string
         try:
-            parsed = json.loads(json_string)
+            parsed = orjson.loads(json_string)
             # Check if this has the required structure
             if "treatment_arms" in parsed:
                 return parsed
             else:
                 self.logger.warning("Parsed JSON is missing 'treatment_arms' key. Attempting recovery.")
                 # Continue to fallback logic
-        except json.JSONDecodeError as e:
-            self.logger.warning(f"Initial JSON parsing failed: {e}. Attempting to find largest valid JSON object.")
+        except orjson.JSONDecodeError as e:
+            self.logger.warning("Initial JSON parsing failed: %s. Attempting to find largest valid JSON object.", e)
 
         # Enhanced fallback: try to find the complete JSON object
         try:
             # Look for patterns that might indicate a complete JSON with treatment_arms
-            treatment_arms_pattern = r'"treatment_arms"\s*:\s*\['
-            if re.search(treatment_arms_pattern, json_string):
+            if _TREATMENT_ARMS_RX.search(json_string):
                 self.logger.info("Found treatment_arms pattern in JSON string. Attempting targeted recovery.")
                 
                 # Try to find the JSON object that contains treatment_arms
@@ -179,11 +358,11 @@ class OpenAIClient:
                             if brace_count == 0:
                                 candidate = json_string[start_pos:i+1]
                                 try:
-                                    parsed = json.loads(candidate)
+                                    parsed = orjson.loads(candidate)
                                     if "treatment_arms" in parsed:
                                         self.logger.info("Successfully recovered complete JSON with treatment_arms.")
                                         return parsed
-                                except json.JSONDecodeError:
+                                except orjson.JSONDecodeError:
                                     continue
             
             # Original fallback logic if targeted recovery fails
@@ -200,7 +379,7 @@ class OpenAIClient:
                         substring = json_string[start:end+1]
                         try:
                             # Test if this substring is valid JSON
-                            parsed = json.loads(substring)
+                            parsed = orjson.loads(substring)
                             has_treatment_arms = "treatment_arms" in parsed
                             
                             # Prioritize JSON objects that have treatment_arms
@@ -211,27 +390,29 @@ class OpenAIClient:
                                   (best_match is None or len(substring) > len(best_match))):
                                 best_match = substring
                                 
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             continue # This substring is not valid JSON
             
             if best_match:
-                self.logger.info(f"Successfully recovered a valid JSON object from the response. Has treatment_arms: {best_match_has_arms}")
-                parsed = json.loads(best_match)
+                self.logger.info("Successfully recovered a valid JSON object from the response. Has treatment_arms: %s", best_match_has_arms)
+                parsed = orjson.loads(best_match)
                 
                 # Debug logging for problematic cases
                 if not best_match_has_arms:
-                    self.logger.warning(f"Recovered JSON is missing treatment_arms. Keys found: {list(parsed.keys())}")
-                    self.logger.debug(f"Original response length: {len(original_string)}")
-                    self.logger.debug(f"Cleaned JSON length: {len(json_string)}")
-                    self.logger.debug(f"Recovered JSON length: {len(best_match)}")
+                    self.logger.warning("Recovered JSON is missing treatment_arms. Keys found: %s", list(parsed.keys()))
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("Original response length: %d", len(original_string))
+                        self.logger.debug("Cleaned JSON length: %d", len(json_string))
+                        self.logger.debug("Recovered JSON length: %d", len(best_match))
                     
                 return parsed
 
         except Exception as fallback_e:
-            self.logger.error(f"Fallback JSON parsing also failed: {fallback_e}")
+            self.logger.error("Fallback JSON parsing also failed: %s", fallback_e)
 
-        self.logger.error(f"Final JSON parsing attempt failed after all fallbacks.")
-        self.logger.debug(f"Problematic JSON string after cleaning: {json_string[:500]}...")
+        self.logger.error("Final JSON parsing attempt failed after all fallbacks.")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Problematic JSON string after cleaning: %s...", json_string[:500])
         return None
 
 
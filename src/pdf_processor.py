@@ -1,13 +1,13 @@
-import json
 import logging
 import os
 import re
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import fitz  # PyMuPDF
 
 from src.logger_config import get_logger, log_performance
-from src.repository import create_tables, insert_abstract
+from src.repository import ensure_tables, get_processed_files, insert_abstracts_bulk
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -50,26 +50,55 @@ def split_pdf_abstracts(text):
     return abstracts
 
 
-def extract_text_from_pdf(pdf_path: str) -> Optional[List[str]]:
+# Number of buffered abstracts that triggers a bulk insert during ingestion
+ABSTRACT_FLUSH_SIZE = 100
+
+# Below this page count a PDF is always extracted sequentially
+MIN_PAGES_FOR_PARALLEL = 4
+
+
+def _extract_pages(doc: "fitz.Document", pdf_path: str, start: int, end: int) -> str:
+    """Extract text from pages [start, end) of an open document."""
+    parts = []
+    for page_num in range(start, end):
+        try:
+            page_text = doc[page_num].get_text("text")
+            if page_text:
+                parts.append(page_text)
+                parts.append("\n")
+        except Exception as page_error:
+            logger.warning(f"Error extracting text from page {page_num} in {pdf_path}: {page_error}")
+            continue
+    return "".join(parts)
+
+
+def _extract_block(pdf_path: str, start: int, end: int) -> str:
+    """Worker entry point: reopen the PDF in a child process and extract one block of pages."""
+    with fitz.open(pdf_path) as doc:
+        return _extract_pages(doc, pdf_path, start, end)
+
+
+def extract_text_from_pdf(pdf_path: str, page_workers: int = 1) -> Optional[List[str]]:
     """
     Extracts text from a single PDF file and splits it into multiple abstracts using PyMuPDF and a robust regex.
+
+    With page_workers > 1, large PDFs are split into contiguous page blocks that are
+    extracted in separate processes (each reopens the file, since one MuPDF document
+    handle can't be shared).
     """
     try:
-        doc = fitz.open(pdf_path)
-        full_text = ""
-
-        # Extract text from each page with better error handling
-        for page_num in range(len(doc)):
-            try:
-                page = doc[page_num]
-                page_text = page.get_text()
-                if page_text:
-                    full_text += page_text + "\n"
-            except Exception as page_error:
-                logger.warning(f"Error extracting text from page {page_num} in {pdf_path}: {page_error}")
-                continue
-
-        doc.close()
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            if page_workers <= 1 or page_count < MIN_PAGES_FOR_PARALLEL:
+                full_text = _extract_pages(doc, pdf_path, 0, page_count)
+
+        if page_workers > 1 and page_count >= MIN_PAGES_FOR_PARALLEL:
+            block_size = -(-page_count // page_workers)
+            starts = list(range(0, page_count, block_size))
+            ends = [min(start + block_size, page_count) for start in starts]
+            with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+                # map() yields blocks in submission order, so pages stay in sequence
+                full_text = "".join(executor.map(_extract_block, [pdf_path] * len(starts), starts, ends))
 
         if not full_text.strip():
             logger.warning(f"No text extracted from {pdf_path}")
@@ -86,97 +115,118 @@ def extract_text_from_pdf(pdf_path: str) -> Optional[List[str]]:
         return None
 
 
+def _extract_one(pdf_path: str) -> Tuple[str, Optional[List[str]]]:
+    """Worker entry point: extract the abstracts of a single PDF in a child process."""
+    return os.path.basename(pdf_path), extract_text_from_pdf(pdf_path)
+
+
 class PDFProcessor:
-    def __init__(
-        self,
-        processed_files_record: str = "data/processed_files.json",
-        abstract_pdf_path: str = "resources",
-    ):
+    def __init__(self, abstract_pdf_path: str = "resources", max_workers: Optional[int] = None,
+                 page_workers: Optional[int] = None):
         """
         Initialize the PDFProcessor with configuration and logging.
 
+        Processed PDFs are tracked in the ProcessedFiles table of the database.
+
         Parameters:
-            processed_files_record (str): Path to the JSON file tracking processed PDFs
             abstract_pdf_path (str): Directory containing PDF files to process
+            max_workers (Optional[int]): Number of extraction processes (defaults to CPU count)
+            page_workers (Optional[int]): Processes splitting the pages of a PDF when it is the only
+                new file, so a single large PDF still uses several cores (defaults to max_workers)
         """
         self.logger = get_logger(__name__)
         self.logger.info("PDFProcessor initialized")
-        self._processed_files_record = processed_files_record
         self._abstract_pdf_path = abstract_pdf_path
+        self._max_workers = max_workers or os.cpu_count()
+        self._page_workers = page_workers or self._max_workers
 
-        # Ensure the processed files record exists
-        if not os.path.exists(self._processed_files_record):
-            os.makedirs(os.path.dirname(self._processed_files_record), exist_ok=True)
-            with open(self._processed_files_record, "w") as f:
-                json.dump([], f)
-            self.logger.info(f"Created new processed files record at {self._processed_files_record}")
+        # Ensure the Abstracts and ProcessedFiles tables exist
+        ensure_tables()
 
-    def _load_processed_files(self) -> set:
-        """Load the set of previously processed files."""
-        try:
-            with open(self._processed_files_record, "r") as f:
-                return set(json.load(f))
-        except Exception as e:
-            self.logger.error(f"Error loading processed files record: {e}")
-            return set()
-
-    def _save_processed_files(self, processed_files: set) -> None:
-        """Save the set of processed files."""
-        try:
-            with open(self._processed_files_record, "w") as f:
-                json.dump(list(processed_files), f)
-        except Exception as e:
-            self.logger.error(f"Error saving processed files record: {e}")
+        # Names of PDFs already in the database, loaded on first use and kept in sync
+        self._processed: Optional[Set[str]] = None
 
     @log_performance
     def _extract_new_pdfs(self) -> Dict[str, Any]:
         """
         Extract text from new PDF files and insert them into the database.
 
+        PDFs are extracted in parallel worker processes; database writes stay in
+        this process. A lone new PDF is instead split into page blocks across
+        page_workers processes.
+
         Returns:
             Dict[str, Any]: Statistics about the processing operation
         """
-        # Ensure the Abstracts table exists
-        create_tables()
-
-        processed_files = self._load_processed_files()
-        new_processed_files = set(processed_files)
+        if self._processed is None:
+            self._processed = get_processed_files()
 
         stats = {"total_files": 0, "processed_files": 0, "failed_files": 0, "failed_file_names": []}
+        pending_paths: List[str] = []
+        pending_rows: List[Tuple[str, str]] = []
+        pending_filenames: List[str] = []
 
-        for filename in os.listdir(self._abstract_pdf_path):
-            if not filename.lower().endswith(".pdf"):
-                continue
+        with os.scandir(self._abstract_pdf_path) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf") or not entry.is_file():
+                    continue
 
-            stats["total_files"] += 1
+                stats["total_files"] += 1
 
-            if filename in processed_files:
-                self.logger.info(f"Skipping already processed file: {filename}")
-                continue
+                if entry.name in self._processed:
+                    self.logger.info(f"Skipping already processed file: {entry.name}")
+                    continue
 
-            pdf_path = os.path.join(self._abstract_pdf_path, filename)
-            self.logger.info(f"Processing new file: {filename}")
+                pending_paths.append(entry.path)
 
-            abstracts = extract_text_from_pdf(pdf_path)
+        if len(pending_paths) == 1:
+            pdf_path = pending_paths[0]
+            filename = os.path.basename(pdf_path)
+            abstracts = extract_text_from_pdf(pdf_path, page_workers=self._page_workers)
+            self.logger.info(f"Extracted new file: {filename}")
             if abstracts:
-                for abstract in abstracts:
-                    try:
-                        insert_abstract(filename, abstract)
-                        stats["processed_files"] += 1
-                        self.logger.info(f"Successfully processed abstract from {filename}")
-                    except Exception as e:
-                        self.logger.error(f"Error inserting abstract for {filename}: {e}")
-                        stats["failed_files"] += 1
-                        stats["failed_file_names"].append(filename)
-                # Add filename to new_processed_files only if at least one abstract was processed
-                new_processed_files.add(filename)
+                pending_rows.extend((filename, abstract) for abstract in abstracts)
+                pending_filenames.append(filename)
             else:
                 stats["failed_files"] += 1
                 stats["failed_file_names"].append(filename)
+        elif pending_paths:
+            with ProcessPoolExecutor(max_workers=min(self._max_workers, len(pending_paths))) as executor:
+                futures = [executor.submit(_extract_one, pdf_path) for pdf_path in pending_paths]
+                for future in as_completed(futures):
+                    filename, abstracts = future.result()
+                    self.logger.info(f"Extracted new file: {filename}")
+                    if abstracts:
+                        pending_rows.extend((filename, abstract) for abstract in abstracts)
+                        pending_filenames.append(filename)
+                    else:
+                        stats["failed_files"] += 1
+                        stats["failed_file_names"].append(filename)
+
+                    # Flush at file boundaries so a file's abstracts commit together
+                    if len(pending_rows) >= ABSTRACT_FLUSH_SIZE:
+                        self._flush_abstracts(pending_rows, pending_filenames, stats)
 
-        self._save_processed_files(new_processed_files)
+        self._flush_abstracts(pending_rows, pending_filenames, stats)
         return stats
 
+    def _flush_abstracts(self, pending_rows: List[Tuple[str, str]], pending_filenames: List[str], stats: Dict[str, Any]) -> None:
+        """Insert pending abstracts and mark their files processed in one transaction, then clear the buffers."""
+        if not pending_rows:
+            return
+        try:
+            insert_abstracts_bulk(pending_rows, pending_filenames)
+            # Only trust the in-memory set once the transaction has committed
+            self._processed.update(pending_filenames)
+            stats["processed_files"] += len(pending_rows)
+            self.logger.info(f"Successfully processed {len(pending_rows)} abstracts from {len(pending_filenames)} files")
+        except Exception as e:
+            self.logger.error(f"Error inserting abstracts: {e}")
+            stats["failed_files"] += len(pending_filenames)
+            stats["failed_file_names"].extend(pending_filenames)
+        pending_rows.clear()
+        pending_filenames.clear()
+
     @log_performance
     def process_new_pdfs(self) -> Dict[str, Any]:
         """
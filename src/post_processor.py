@@ -4,7 +4,8 @@ Handles all validation, formatting, and business rules while maintaining arm-spe
 """
 
 import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Optional
 import logging
 
 from src.numeric_field_processor import process_treatment_arm, classify_p_value_significance
@@ -12,6 +13,29 @@ from src.therapy_classifier import classify_therapy
 
 logger = logging.getLogger(__name__)
 
+def _memoize_str(func):
+    """
+    Memoize a pure string formatter with lru_cache.
+
+    Only for functions of short field values that do not log: cached calls would
+    log once per distinct input, and large arguments (e.g. full texts) would stay
+    alive in the cache.
+
+    Inputs come from LLM JSON and may occasionally be lists or dicts, which are
+    unhashable, so anything that isn't a string bypasses the cache.
+    """
+    cached = lru_cache(maxsize=2048)(func)
+
+    @wraps(func)
+    def wrapper(value, *args, **kwargs):
+        if isinstance(value, str):
+            return cached(value, *args, **kwargs)
+        return func(value, *args, **kwargs)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
 # Validation constants based on user prompts
 VALID_STAGES = {
     "Stage I", "Stage I/II", "Stage II", "Stage II/III", 
@@ -48,35 +72,97 @@ VALID_NCCN_PREFERENCES = {
 
 TRIAL_NAME_PATTERNS = ["keynote", "checkmate", "masterkey"]
 
+# Lowercase lookup tables for direct matches of the controlled vocabularies
+_STAGE_LOOKUP = {stage.lower(): stage for stage in VALID_STAGES}
+_LINE_LOOKUP = {line.lower(): line for line in VALID_LINE_OF_TREATMENT}
+_NCCN_LOOKUP = {pref.lower(): pref for pref in VALID_NCCN_PREFERENCES}
+_NCCN_NOT_APPLICABLE = frozenset({"not applicable", "n/a", "not listed", "not mentioned", ""})
+
+# Lowercase cancer type variants mapped to their canonical class
+_CANCER_TYPES = {
+    "resected cutaneous melanoma": "Resected Cutaneous Melanoma",
+    "unresectable cutaneous melanoma": "Unresectable Cutaneous Melanoma", 
+    "cutaneous melanoma with brain metastasis": "Cutaneous melanoma with Brain metastasis",
+    "cutaneous melanoma with brain metastases": "Cutaneous melanoma with Brain metastasis",
+    "cutaneous melanoma with cns metastasis": "Cutaneous Melanoma with CNS metastasis",
+    "cutaneous melanoma with cns metastases": "Cutaneous Melanoma with CNS metastasis",
+    "uveal melanoma": "Uveal Melanoma",
+    "mucosal melanoma": "Mucosal Melanoma", 
+    "acral melanoma": "Acral Melanoma",
+    "basal cell carcinoma": "Basal Cell Carcinoma",
+    "merkel cell carcinoma": "Merkel Cell Carcinoma",
+    "cutaneous squamous cell carcinoma": "Cutaneous Squamous Cell Carcinoma"
+}
+
+# Keywords that qualify a melanoma mention
+_CANCER_FLAG_TERMS = ("melanoma", "brain", "cns", "unresectable", "resected", "surgically removed")
+# Longest alternatives first so full cancer-type names win over embedded keywords
+_CANCER_TERMS = sorted({*_CANCER_TYPES, *_CANCER_FLAG_TERMS}, key=lambda term: (-len(term), term))
+_CANCER_RX = re.compile("|".join(re.escape(term) for term in _CANCER_TERMS))
+_CANCER_TERM_FLAGS = {
+    term: frozenset(flag for flag in _CANCER_FLAG_TERMS if flag in term) for term in _CANCER_TERMS
+}
+
+# Stage variations as (substrings, stage), checked in order: ranges first, then the
+# highest single stage, so "stage iii or stage iv" is Stage IV
+_STAGE_VARIANTS = (
+    (("stage i/ii", "stage 1/2"), "Stage I/II"),
+    (("stage ii/iii", "stage 2/3"), "Stage II/III"),
+    (("stage iii/iv", "stage 3/4"), "Stage III/Stage IV"),
+    (("stage iv", "stage 4"), "Stage IV"),
+    (("stage iii", "stage 3"), "Stage III"),
+    (("stage ii", "stage 2"), "Stage II"),
+    (("stage i", "stage 1"), "Stage I"),
+)
+
+# Line of treatment variations; groups are listed in priority order
+_LINE_RX = re.compile(
+    r'(?P<neoadjuvant>neo-?adjuvant)'
+    r'|(?P<first>first[- ]line|1st line|untreated|naive)'
+    r'|(?P<second>second[- ]line|2nd line|previously treated)'
+    r'|(?P<third>third[- ]line|3rd line|heavily pretreated)'
+)
+_LINE_BY_GROUP = (
+    ("neoadjuvant", "Neoadjuvant"),
+    ("first", "First Line or Untreated"),
+    ("second", "2nd Line"),
+    ("third", "3rd Line+"),
+)
+
+_PUB_COPYRIGHT_BY = re.compile(r'© \d{4} by [^.]*\.?')
+_PUB_COPYRIGHT = re.compile(r'© \d{4} [^.]*\.?')
+_JOURNAL_PATTERNS = [
+    (re.compile(r'new england journal.*|n engl j med', re.IGNORECASE), 'NEJM'),
+    (re.compile(r'lancet oncology|lancet oncol', re.IGNORECASE), 'Lancet Oncol'),
+    (re.compile(r'lancet', re.IGNORECASE), 'Lancet'),
+    (re.compile(r'journal of clinical oncology|j clin oncol', re.IGNORECASE), 'JCO'),
+]
+# e.g. "NEJM 2017; 377:1345-56" -> year, volume, start page, end page
+_PUB_EXTRACT = re.compile(r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)')
+_PUB_FALLBACK = re.compile(r'([A-Za-z .]+)[,;]? (\d{4})[;:, ]+(\d+)[;:, ]+([\d]+)[–-]([\d]+)')
+_PUB_FORMATTED = re.compile(r'^[A-Za-z ]+ \d{4}; \d+:\d+-\d+$')
+# Numbered-trial pattern per family (e.g. "keynote-006"), in TRIAL_NAME_PATTERNS priority order
+_TRIAL_NUMBERED_RXS = tuple(
+    (pattern, re.compile(f'{pattern}[-\\s]?(\\d+[a-z]*)')) for pattern in TRIAL_NAME_PATTERNS
+)
+_PCT_NUM = re.compile(r'(\d+(?:\.\d+)?)')
+
 def validate_stage(stage: str) -> str:
     """Validate and standardize stage according to 8-class requirement."""
     if not stage or not isinstance(stage, str):
         return ""
     
     stage = stage.strip()
+    stage_lower = stage.lower()
     
     # Direct match
-    for valid_stage in VALID_STAGES:
-        if stage.lower() == valid_stage.lower():
-            return valid_stage
+    if stage_lower in _STAGE_LOOKUP:
+        return _STAGE_LOOKUP[stage_lower]
     
     # Pattern matching for variations
-    stage_lower = stage.lower()
-    
-    if "stage i/ii" in stage_lower or "stage 1/2" in stage_lower:
-        return "Stage I/II"
-    elif "stage ii/iii" in stage_lower or "stage 2/3" in stage_lower:
-        return "Stage II/III"  
-    elif "stage iii/iv" in stage_lower or "stage 3/4" in stage_lower:
-        return "Stage III/Stage IV"
-    elif "stage iv" in stage_lower or "stage 4" in stage_lower:
-        return "Stage IV"
-    elif "stage iii" in stage_lower or "stage 3" in stage_lower:
-        return "Stage III"
-    elif "stage ii" in stage_lower or "stage 2" in stage_lower:
-        return "Stage II"
-    elif "stage i" in stage_lower or "stage 1" in stage_lower:
-        return "Stage I"
+    for variants, valid_stage in _STAGE_VARIANTS:
+        if any(variant in stage_lower for variant in variants):
+            return valid_stage
     
     logger.warning(f"Stage validation failed for: '{stage}' - not in valid 8 classes")
     return stage  # Return original if no match
@@ -88,49 +174,40 @@ def validate_cancer_type(cancer_type: str) -> str:
     
     cancer_lower = cancer_type.lower().strip()
     
-    # Valid cancer types
-    valid_types = {
-        "resected cutaneous melanoma": "Resected Cutaneous Melanoma",
-        "unresectable cutaneous melanoma": "Unresectable Cutaneous Melanoma", 
-        "cutaneous melanoma with brain metastasis": "Cutaneous melanoma with Brain metastasis",
-        "cutaneous melanoma with brain metastases": "Cutaneous melanoma with Brain metastasis",
-        "cutaneous melanoma with cns metastasis": "Cutaneous Melanoma with CNS metastasis",
-        "cutaneous melanoma with cns metastases": "Cutaneous Melanoma with CNS metastasis",
-        "uveal melanoma": "Uveal Melanoma",
-        "mucosal melanoma": "Mucosal Melanoma", 
-        "acral melanoma": "Acral Melanoma",
-        "basal cell carcinoma": "Basal Cell Carcinoma",
-        "merkel cell carcinoma": "Merkel Cell Carcinoma",
-        "cutaneous squamous cell carcinoma": "Cutaneous Squamous Cell Carcinoma"
-    }
-    
     # Direct match
-    if cancer_lower in valid_types:
-        return valid_types[cancer_lower]
-    
-    # Partial matches for melanoma with brain metastasis
-    if "melanoma" in cancer_lower and ("brain" in cancer_lower or "cns" in cancer_lower):
-        if "brain" in cancer_lower:
+    if cancer_lower in _CANCER_TYPES:
+        return _CANCER_TYPES[cancer_lower]
+    
+    # Single scan for known cancer types and qualifying keywords
+    flags = set()
+    found_types = set()
+    for match in _CANCER_RX.finditer(cancer_lower):
+        term = match.group()
+        flags |= _CANCER_TERM_FLAGS[term]
+        if term in _CANCER_TYPES:
+            found_types.add(term)
+    
+    if "melanoma" in flags:
+        # Partial matches for melanoma with brain metastasis
+        if "brain" in flags:
             return "Cutaneous melanoma with Brain metastasis"
-        elif "cns" in cancer_lower:
+        if "cns" in flags:
             return "Cutaneous Melanoma with CNS metastasis"
-    
-    # Partial matches for unresectable melanoma
-    if "melanoma" in cancer_lower and "unresectable" in cancer_lower:
-        return "Unresectable Cutaneous Melanoma"
-    
-    # Partial matches for resected melanoma
-    if "melanoma" in cancer_lower and ("resected" in cancer_lower or "surgically removed" in cancer_lower):
-        return "Resected Cutaneous Melanoma"
+        # Partial matches for unresectable melanoma
+        if "unresectable" in flags:
+            return "Unresectable Cutaneous Melanoma"
+        # Partial matches for resected melanoma
+        if "resected" in flags or "surgically removed" in flags:
+            return "Resected Cutaneous Melanoma"
     
     # Generic melanoma fallback
     if cancer_lower == "melanoma":
         logger.warning(f"Cancer type validation failed for: '{cancer_type}' - not in valid 10 classes")
         return cancer_type  # Return original instead of empty string
     
-    # Check for other specific types
-    for key, value in valid_types.items():
-        if key in cancer_lower:
+    # Check for other specific types (in table order)
+    for key, value in _CANCER_TYPES.items():
+        if key in found_types:
             return value
     
     logger.warning(f"Cancer type validation failed for: '{cancer_type}' - not in valid 10 classes")
@@ -142,23 +219,17 @@ def validate_line_of_treatment(line: str) -> str:
         return ""
     
     line = line.strip()
+    line_lower = line.lower()
     
     # Direct match
-    for valid_line in VALID_LINE_OF_TREATMENT:
-        if line.lower() == valid_line.lower():
-            return valid_line
-    
-    # Pattern matching for variations
-    line_lower = line.lower()
+    if line_lower in _LINE_LOOKUP:
+        return _LINE_LOOKUP[line_lower]
     
-    if any(term in line_lower for term in ["neoadjuvant", "neo-adjuvant"]):
-        return "Neoadjuvant"
-    elif any(term in line_lower for term in ["first line", "1st line", "first-line", "untreated", "treatment-naive", "naive"]):
-        return "First Line or Untreated"
-    elif any(term in line_lower for term in ["second line", "2nd line", "second-line", "previously treated"]):
-        return "2nd Line"
-    elif any(term in line_lower for term in ["third line", "3rd line", "third-line", "3rd line+", "heavily pretreated"]):
-        return "3rd Line+"
+    # Pattern matching for variations (highest-priority class wins)
+    found = {match.lastgroup for match in _LINE_RX.finditer(line_lower)}
+    for group, canonical in _LINE_BY_GROUP:
+        if group in found:
+            return canonical
     
     logger.warning(f"Line of treatment validation failed for: '{line}' - not in valid 4 classes")
     return line  # Return original if no match
@@ -171,8 +242,12 @@ def validate_nccn_preference(preference: str) -> str:
     preference = preference.strip()
     pref_lower = preference.lower()
     
-    # Handle "Not applicable" case first
-    if pref_lower in ["not applicable", "n/a", "not listed", "not mentioned", ""]:
+    # Direct match
+    if pref_lower in _NCCN_LOOKUP:
+        return _NCCN_LOOKUP[pref_lower]
+    
+    # Handle "Not applicable" variations
+    if pref_lower in _NCCN_NOT_APPLICABLE:
         return "Not applicable (Not listed in NCCN guidelines)"
     
     # Pattern matching for variations
@@ -180,57 +255,35 @@ def validate_nccn_preference(preference: str) -> str:
         return "Preferred Regimen"
     elif "not recommended" in pref_lower:
         return "Not Recommended"
-    elif "other recommended" in pref_lower or "recommended" in pref_lower:
+    elif "recommended" in pref_lower:
         return "Other recommended regimens"
     elif "useful" in pref_lower or "certain circumstances" in pref_lower:
         return "useful in certain circumstances"
     
-    # Direct match for completeness
-    for valid_pref in VALID_NCCN_PREFERENCES:
-        if pref_lower == valid_pref.lower():
-            return valid_pref
-    
     logger.warning(f"NCCN preference validation failed for: '{preference}' - could not map to a valid class")
     return preference  # Return original if no match
 
+@_memoize_str
 def format_publication_name(pub_name: str) -> str:
     """Format publication name to strict 'Journal YEAR; Volume:StartPage-EndPage' format."""
-    import re
     if not pub_name or not isinstance(pub_name, str):
         return ""
     pub_name = pub_name.strip()
     # Remove copyright and extraneous info
-    pub_name = re.sub(r'© \d{4} by [^.]*\.?', '', pub_name)
-    pub_name = re.sub(r'© \d{4} [^.]*\.?', '', pub_name)
+    pub_name = _PUB_COPYRIGHT_BY.sub('', pub_name)
+    pub_name = _PUB_COPYRIGHT.sub('', pub_name)
     pub_name = pub_name.strip(' .')
 
     # Normalize journal names
-    journal_map = {
-        r'new england journal.*|n engl j med': 'NEJM',
-        r'lancet oncology|lancet oncol': 'Lancet Oncol',
-        r'lancet': 'Lancet',
-        r'journal of clinical oncology|j clin oncol': 'JCO',
-    }
     journal = None
-    for pattern, abbr in journal_map.items():
-        if re.search(pattern, pub_name, re.IGNORECASE):
+    for pattern, abbr in _JOURNAL_PATTERNS:
+        if pattern.search(pub_name):
             journal = abbr
             break
-    # Patterns for extraction
-    patterns = [
-        # NEJM 2017; 377:1345-56
-        (r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)', 'NEJM'),
-        # Lancet 2017; 390:1853-62
-        (r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)', 'Lancet'),
-        # JCO 2017; 36:1658-1667
-        (r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)', 'JCO'),
-        # Lancet Oncol 2012; 13:459-65
-        (r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)', 'Lancet Oncol'),
-    ]
     # Try to match known journals
     if journal:
         # Try to extract year, volume, start, end
-        m = re.search(r'(\d{4}).*?(\d+)[;:, ]+([\d]+)[–-]([\d]+)', pub_name)
+        m = _PUB_EXTRACT.search(pub_name)
         if m:
             year, volume, start, end = m.groups()
             # Remove decimals from page numbers
@@ -238,7 +291,7 @@ def format_publication_name(pub_name: str) -> str:
             end = end.split('.')[0]
             return f"{journal} {year}; {volume}:{start}-{end}"
     # Fallback: try to extract any journal/year/volume/pages
-    m = re.search(r'([A-Za-z .]+)[,;]? (\d{4})[;:, ]+(\d+)[;:, ]+([\d]+)[–-]([\d]+)', pub_name)
+    m = _PUB_FALLBACK.search(pub_name)
     if m:
         j, year, volume, start, end = m.groups()
         j = j.strip().replace('Journal of Clinical Oncology', 'JCO').replace('New England Journal of Medicine', 'NEJM').replace('Lancet Oncology', 'Lancet Oncol').replace('Lancet', 'Lancet')
@@ -246,7 +299,7 @@ def format_publication_name(pub_name: str) -> str:
         end = end.split('.')[0]
         return f"{j} {year}; {volume}:{start}-{end}"
     # If already in correct format, return as-is
-    if re.match(r'^[A-Za-z ]+ \d{4}; \d+:\d+-\d+$', pub_name):
+    if _PUB_FORMATTED.match(pub_name):
         return pub_name
     # If no pattern matches, return cleaned original
     return pub_name
@@ -259,10 +312,10 @@ def detect_trial_name(trial_name: str, full_text: str = "") -> str:
     # Check trial_name field first
     trial_lower = trial_name.lower()
     
-    for pattern in TRIAL_NAME_PATTERNS:
+    for pattern, numbered_rx in _TRIAL_NUMBERED_RXS:
         if pattern in trial_lower:
             # Extract the specific trial name (e.g., "Keynote-006")
-            match = re.search(f'{pattern}[-\\s]?(\\d+[a-z]*)', trial_lower)
+            match = numbered_rx.search(trial_lower)
             if match:
                 return f"{pattern.capitalize()}-{match.group(1)}"
             else:
@@ -271,8 +324,8 @@ def detect_trial_name(trial_name: str, full_text: str = "") -> str:
     # If not found in trial_name, check full_text if provided
     if full_text:
         text_lower = full_text.lower()
-        for pattern in TRIAL_NAME_PATTERNS:
-            match = re.search(f'{pattern}[-\\s]?(\\d+[a-z]*)', text_lower)
+        for pattern, numbered_rx in _TRIAL_NUMBERED_RXS:
+            match = numbered_rx.search(text_lower)
             if match:
                 return f"{pattern.capitalize()}-{match.group(1)}"
     
@@ -300,6 +353,7 @@ def process_discontinuation_text(value: str) -> str:
     
     return value  # Return original if no pattern matches
 
+@_memoize_str
 def classify_research_sponsor(sponsor: str) -> str:
     """Classify research sponsor into Industry-Sponsored or non Industry-Sponsored."""
     if not sponsor or not isinstance(sponsor, str):
@@ -314,6 +368,7 @@ def classify_research_sponsor(sponsor: str) -> str:
     # Anything else → "Industry-Sponsored"
     return "Industry-Sponsored"
 
+@_memoize_str
 def format_generic_name(generic_name: str) -> str:
     """Ensure proper formatting of drug combinations with + separator."""
     if not generic_name or not isinstance(generic_name, str):
@@ -333,6 +388,7 @@ def format_generic_name(generic_name: str) -> str:
     
     return generic_name.strip()
 
+@_memoize_str
 def process_safety_data(value: str, field_name: str) -> str:
     """Process safety data fields to handle both numeric and text-based values."""
     if not value or not isinstance(value, str):
@@ -340,115 +396,135 @@ def process_safety_data(value: str, field_name: str) -> str:
     
     value = value.strip()
     
-    # If it's already a number, return as-is
-    if value.replace('.', '').replace('%', '').isdigit():
-        return value
+    # If it's already a number (optionally with a trailing %), return as-is
+    number = value[:-1] if value.endswith('%') else value
+    if number[-1:].isdigit() and (number[0].isdigit() or number[0] == '.'):
+        try:
+            float(number)
+            return value
+        except ValueError:
+            pass
     
     # For percentage fields, try to extract numbers
     if '%' in value:
         # Extract percentage numbers
-        import re
-        numbers = re.findall(r'(\d+(?:\.\d+)?)', value)
-        if numbers:
-            return numbers[0]  # Return first number found
+        match = _PCT_NUM.search(value)
+        if match:
+            return match.group(1)  # Return first number found
     
     # For adverse events that are text descriptions, return as-is for now
     # These will be processed by the numeric processor later
     return value
 
-def process_shared_fields(shared_data: Dict[str, Any], full_text: str = "") -> Dict[str, Any]:
-    """Process and validate shared fields (apply once per publication)."""
-    processed = shared_data.copy()
+def _shared_field_updates(shared_data: Dict[str, Any], full_text: str = "") -> Dict[str, Any]:
+    """Return only the shared fields that processing rewrites or adds."""
+    updates = {}
     
     # Format publication name
-    if "Publication name" in processed:
-        processed["Publication name"] = format_publication_name(processed["Publication name"])
+    if "Publication name" in shared_data:
+        updates["Publication name"] = format_publication_name(shared_data["Publication name"])
     
     # Detect trial name
-    if "Trial name" in processed:
-        processed["Trial name"] = detect_trial_name(processed["Trial name"], full_text)
+    if "Trial name" in shared_data:
+        updates["Trial name"] = detect_trial_name(shared_data["Trial name"], full_text)
     
     # Process NCCN fields
-    if "Listed in NCCN guidelines" in processed:
+    if "Listed in NCCN guidelines" in shared_data:
         # Convert to YES/NO format
-        nccn_value = processed["Listed in NCCN guidelines"]
+        nccn_value = shared_data["Listed in NCCN guidelines"]
         if isinstance(nccn_value, str):
             nccn_lower = nccn_value.lower().strip()
             if nccn_lower in ["yes", "true", "1"]:
-                processed["Listed in NCCN guidelines"] = "YES"
+                updates["Listed in NCCN guidelines"] = "YES"
             elif nccn_lower in ["no", "false", "0", ""]:
-                processed["Listed in NCCN guidelines"] = "NO"
+                updates["Listed in NCCN guidelines"] = "NO"
     
-    if "Preference according to NCCN" in processed:
-        processed["Preference according to NCCN"] = validate_nccn_preference(processed["Preference according to NCCN"])
+    if "Preference according to NCCN" in shared_data:
+        updates["Preference according to NCCN"] = validate_nccn_preference(shared_data["Preference according to NCCN"])
     
     # Classify research sponsor (if it exists in shared fields)
-    if "Sponsors" in processed:
-        processed["Research Sponsor Type"] = classify_research_sponsor(processed["Sponsors"])
+    if "Sponsors" in shared_data:
+        updates["Research Sponsor Type"] = classify_research_sponsor(shared_data["Sponsors"])
     
-    return processed
+    return updates
 
-def process_arm_specific_fields(arm_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Process and validate arm-specific fields (apply per treatment arm)."""
-    processed = arm_data.copy()
-    
-    # Validate categorical fields
-    if "Stage" in processed:
-        processed["Stage"] = validate_stage(processed["Stage"])
-    
-    if "Cancer Type" in processed:
-        processed["Cancer Type"] = validate_cancer_type(processed["Cancer Type"])
-    
-    if "Line of Treatment" in processed:
-        processed["Line of Treatment"] = validate_line_of_treatment(processed["Line of Treatment"])
-    
-    if "Preference according to NCCN" in processed:
-        processed["Preference according to NCCN"] = validate_nccn_preference(processed["Preference according to NCCN"])
+def process_shared_fields(shared_data: Dict[str, Any], full_text: str = "", in_place: bool = False) -> Dict[str, Any]:
+    """
+    Process and validate shared fields (apply once per publication).
+
+    With in_place=True the caller's dict is updated and returned instead of copied.
+    """
+    updates = _shared_field_updates(shared_data, full_text)
+    if in_place:
+        shared_data.update(updates)
+        return shared_data
+    return shared_data | updates
+
+# Safety fields that may hold numeric or text values
+SAFETY_FIELDS = frozenset({
+    "Adverse events (AE)",
+    "Treatment emergent adverse events (TEAE)",
+    "Treatment-related adverse events (TRAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment emergent adverse events (TEAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-related adverse events (TRAE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-emergent adverse events (TEAE)",
+    "Grade 4 treatment emergent adverse events",
+    "Grade 5 treatment emergent adverse events",
+    "Immune related adverse events (irAEs)",
+    "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
+    "Adverse events (AEs) leading to discontinuation",
+    "Treatment-emergent adverse events (TEAE) led to death",
+    "Adverse Events leading to death",
+})
+
+# Safety fields that may also state "no discontinuation" in words
+DISCONTINUATION_FIELDS = frozenset({
+    "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
+    "Adverse events (AEs) leading to discontinuation",
+})
+
+
+def _safety_handler(field_name: str) -> Callable[[Any], str]:
+    return lambda value: process_safety_data(value, field_name)
+
+
+def _discontinuation_handler(field_name: str) -> Callable[[Any], str]:
+    return lambda value: process_discontinuation_text(process_safety_data(value, field_name))
+
+
+# Per-field processing applied to each treatment arm in a single pass
+FIELD_HANDLERS: Dict[str, Callable[[Any], Any]] = {
+    "Stage": validate_stage,
+    "Cancer Type": validate_cancer_type,
+    "Line of Treatment": validate_line_of_treatment,
+    "Preference according to NCCN": validate_nccn_preference,
+    "Generic name": format_generic_name,
+    **{field: _safety_handler(field) for field in SAFETY_FIELDS - DISCONTINUATION_FIELDS},
+    **{field: _discontinuation_handler(field) for field in DISCONTINUATION_FIELDS},
+}
+
+def _arm_field_updates(arm_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the arm fields that categorical/safety processing rewrites or adds."""
+    updates = {}
     
-    # Format generic name
-    if "Generic name" in processed:
-        processed["Generic name"] = format_generic_name(processed["Generic name"])
+    # Validate categorical fields, format generic name and clean safety data
+    for field, value in arm_data.items():
+        handler = FIELD_HANDLERS.get(field)
+        if handler:
+            updates[field] = handler(value)
     
     # Classify therapy type based on generic name
-    if "Generic name" in processed:
-        processed["Type of therapy"] = classify_therapy(processed["Generic name"])
-    
-    # Process safety data fields
-    safety_fields = [
-        "Adverse events (AE)",
-        "Treatment emergent adverse events (TEAE)",
-        "Treatment-related adverse events (TRAE)",
-        "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)",
-        "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment emergent adverse events (TEAE)",
-        "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-related adverse events (TRAE)",
-        "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher treatment-emergent adverse events (TEAE)",
-        "Grade 4 treatment emergent adverse events",
-        "Grade 5 treatment emergent adverse events",
-        "Immune related adverse events (irAEs)",
-        "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
-        "Adverse events (AEs) leading to discontinuation",
-        "Treatment-emergent adverse events (TEAE) led to death",
-        "Adverse Events leading to death"
-    ]
-    
-    for field in safety_fields:
-        if field in processed:
-            processed[field] = process_safety_data(processed[field], field)
+    if "Generic name" in updates:
+        updates["Type of therapy"] = classify_therapy(updates["Generic name"])
     
-    # Process discontinuation text patterns
-    discontinuation_fields = [
-        "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
-        "Adverse events (AEs) leading to discontinuation"
-    ]
-    
-    for field in discontinuation_fields:
-        if field in processed:
-            processed[field] = process_discontinuation_text(processed[field])
-    
-    # Apply numeric field processing (includes p-value classification)
-    processed = process_treatment_arm(processed)
-    
-    return processed
+    return updates
+
+def process_arm_specific_fields(arm_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Process and validate arm-specific fields (apply per treatment arm)."""
+    # Numeric field processing (includes p-value classification) builds the output
+    # dict, applying the field updates as it goes instead of copying the arm first
+    return process_treatment_arm(arm_data, _arm_field_updates(arm_data))
 
 def process_extracted_data(raw_data: Dict[str, Any], full_text: str = "") -> Dict[str, Any]:
     """
@@ -462,7 +538,7 @@ def process_extracted_data(raw_data: Dict[str, Any], full_text: str = "") -> Dic
     
     # Process shared fields (once per publication)
     shared_fields = {k: v for k, v in raw_data.items() if k != "treatment_arms"}
-    processed_data.update(process_shared_fields(shared_fields, full_text))
+    processed_data.update(process_shared_fields(shared_fields, full_text, in_place=True))
     
     # Process treatment arms (each arm individually)
     treatment_arms = raw_data.get("treatment_arms", [])
@@ -1,20 +1,48 @@
-import json
+import mmap
 import re
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+
+import orjson
+
+# p-value pattern and fallback keywords used by validate_p_value_classification.
+# Each keyword group of _PVAL_CLASS_RE is one class, in priority order. The negated
+# forms ("insignificant", "nonsignificant", ...) are listed explicitly and the plain
+# stem is anchored at a word start, so they never count as "Significant"; the stem
+# also covers "significance" (e.g. "trend toward significance").
+_P_VALUE_RE = re.compile(r'p[<>=]\s*(\d*\.?\d+)', re.IGNORECASE)
+_PVAL_CLASS_RE = re.compile(
+    r'(non[- ]?significant|insignificant|not (?:statistically )?significant|\bns\b)'
+    r'|(highly significant|very significant)'
+    r'|(\bsignifican|\bsig\b)',
+    re.IGNORECASE,
+)
+_PVAL_CLASSES = ("Non-Significant", "Highly Significant", "Significant")
+
+# Upper bounds (inclusive) of the numeric p-value classes, and their labels
+_PVAL_BUCKETS = (0.001, 0.05)
+_PVAL_LABELS = ("Highly Significant", "Significant", "Non-Significant")
+
+# Mis-decoded UTF-8 sequences in field names and their fixes ('â€' must come after
+# the longer sequences it prefixes)
+_ENC_FIXES = [('â‰¥', '≥'), ('â€™', "'"), ('â€œ', '"'), ('â€', '"')]
+_ENC_MAP = dict(_ENC_FIXES)
+_ENC_RE = re.compile('|'.join(re.escape(k) for k, _ in _ENC_FIXES))
 
 def load_keywords_structure():
     """Load the keywords structure from the JSON file."""
-    with open('data/keywords_structure.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+    # Parse straight from the mapped pages rather than copying the file into a bytes object
+    with open('data/keywords_structure.json', 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
 
 def clean_field_name(field_name):
     """Clean field names by fixing character encoding issues."""
-    # Replace common encoding issues
-    field_name = field_name.replace('â‰¥', '≥')
-    field_name = field_name.replace('â€™', "'")
-    field_name = field_name.replace('â€œ', '"')
-    field_name = field_name.replace('â€', '"')
-    return field_name
+    # Replace common encoding issues in a single pass
+    return _ENC_RE.sub(lambda m: _ENC_MAP[m.group(0)], field_name)
 
+@lru_cache(maxsize=1024)
 def validate_p_value_classification(p_value_text):
     """
     Helper function to classify p-values based on the specified criteria.
@@ -24,39 +52,49 @@ def validate_p_value_classification(p_value_text):
         return ""
     
     # Extract numeric p-value if possible
-    p_match = re.search(r'p[<>=]\s*(\d*\.?\d+)', p_value_text.lower())
+    p_match = _P_VALUE_RE.search(p_value_text)
     
     if p_match:
-        p_val = float(p_match.group(1))
-        if p_val > 0.05:
-            return "Non-Significant"
-        elif p_val <= 0.05 and p_val > 0.001:
-            return "Significant"
-        elif p_val <= 0.001:
-            return "Highly Significant"
+        return _PVAL_LABELS[bisect_left(_PVAL_BUCKETS, float(p_match.group(1)))]
     
-    # If we can't extract numeric value, look for keywords
-    if any(keyword in p_value_text.lower() for keyword in ['non-significant', 'not significant', 'ns']):
-        return "Non-Significant"
-    elif any(keyword in p_value_text.lower() for keyword in ['highly significant', 'very significant']):
-        return "Highly Significant"
-    elif any(keyword in p_value_text.lower() for keyword in ['significant', 'sig']):
-        return "Significant"
+    # If we can't extract numeric value, look for keywords in a single scan,
+    # keeping the highest-priority class found
+    best = None
+    for keyword_match in _PVAL_CLASS_RE.finditer(p_value_text):
+        group = keyword_match.lastindex
+        if best is None or group < best:
+            best = group
+            if best == 1:
+                break
+    if best is not None:
+        return _PVAL_CLASSES[best - 1]
     
     return p_value_text  # Return original if can't classify
 
-def extract_and_process_trial_data(abstract_text):
-    """Complete pipeline to extract and process trial data."""
-    
+@lru_cache(maxsize=1)
+def _build_prompt_prefix():
+    """
+    Build the static parts of the abstract extraction prompt.
+
+    Everything except the abstract text depends only on keywords_structure.json,
+    so it is built once and reused. Returns (prefix, suffix).
+    """
     # Load keywords structure for abstract processing
     keywords = load_keywords_structure()
     all_columns = []
     for category, fields in keywords.items():
-        cleaned_fields = [clean_field_name(field) for field in fields]
+        cleaned_fields = [sys.intern(clean_field_name(field)) for field in fields]
         all_columns.extend(cleaned_fields)
     
+    # Numbered column list and JSON template entries, built in one pass
+    columns_block = []
+    json_block = []
+    for i, col in enumerate(all_columns, 1):
+        columns_block.append(f"{i}. {col}\n")
+        json_block.append(f'      "{col}": "string value"')
+    
     # Generate extraction prompt
-    prompt = (
+    parts = [(
         "You are a clinical expert in competitive intelligence. Your task is to analyze the following clinical trial abstract "
         "and extract structured data according to these critical requirements:\n\n"
         
@@ -161,28 +199,24 @@ def extract_and_process_trial_data(abstract_text):
         "**OUTPUT FORMAT**: Extract data for TWO separate Excel files:\n"
         "- `industry_sponsored_trials.xlsx` - Contains trials where Research Sponsor is NOT 'None'\n"
         "- `non_industry_sponsored_trials.xlsx` - Contains trials where Research Sponsor is 'None'\n\n"
-    )
+    )]
 
     # Add all required fields with proper encoding
-    prompt += "**REQUIRED COLUMNS** (all must be included for each treatment arm):\n"
-    for i, field in enumerate(all_columns, 1):
-        prompt += f"{i}. {field}\n"
+    parts.append("**REQUIRED COLUMNS** (all must be included for each treatment arm):\n")
+    parts.extend(columns_block)
 
-    prompt += (
+    parts.append((
         "\n**REQUIRED JSON OUTPUT FORMAT** (return ONLY the raw JSON, no markdown):\n"
         "{\n"
         '  "sponsor_type": "Industry-Sponsored" or "Non Industry-Sponsored",\n'
         '  "treatment_arms": [\n'
         '    {\n'
-    )
+    ))
 
     # Add all columns to the JSON structure
-    for i, col in enumerate(all_columns):
-        if i > 0:
-            prompt += ',\n'
-        prompt += f'      "{col}": "string value"'
+    parts.append(',\n'.join(json_block))
 
-    prompt += (
+    parts.append((
         '\n    }\n'
         '  ]\n'
         "}\n\n"
@@ -204,7 +238,16 @@ def extract_and_process_trial_data(abstract_text):
         "15. For survival values, extract in months, not percentages\n"
         "16. For p-values, use Non-Significant/Significant/Highly Significant classification\n\n"
         "**Abstract to Process:**\n\n"
-        f"{abstract_text}\n"
-    )
+    ))
+
+    return "".join(parts), "\n"
 
-    return prompt
\ No newline at end of file
+@lru_cache(maxsize=1)
+def _prompt_template():
+    """The full prompt as a %-format string with a single %s hole for the abstract."""
+    prefix, suffix = _build_prompt_prefix()
+    return prefix.replace("%", "%%") + "%s" + suffix.replace("%", "%%")
+
+def extract_and_process_trial_data(abstract_text):
+    """Complete pipeline to extract and process trial data."""
+    return _prompt_template() % (abstract_text,)
@@ -1,37 +1,77 @@
 import os
+import time
+from functools import lru_cache
 from openai import OpenAI
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import httpx
 import logging
+from src.llm_cache import LLMCache
 from src.logger_config import get_logger, log_performance
-import json
+from src.qc_field_selector import QC_KEYWORDS
+from src.text_preprocessor import extract_relevant_sections, has_nct_number
 
 # Load environment variables
 load_dotenv()
 
-QC_KEYWORDS = [
-    "NCT Number",
-    "Generic name",
-    "Cancer Type",
-    "Line of Treatment",
-    "Number of patients",
-    "Objective response rate (ORR)",
-    "Progression free survival (PFS)",
-    "Overall survival (OS)",
-    "Adverse events (AE)",
-    "Grade ≥3 adverse events (AE)",
-    "Treatment emergent adverse events (TEAE) led to treatment discontinuation"
-]
+# Bump whenever the QC prompt changes so cached responses from older prompts are not reused
+QC_PROMPT_VERSION = "5"
 
-def generate_qc_prompt(publication_text):
-    prompt = (
-        "You are a clinical expert in competitive intelligence. Extract ONLY the following 11 critical QC fields from the clinical trial publication. "
-        "Return ONLY raw JSON, no markdown or code blocks. The response should start with { and end with }.\n\n"
+# Model, endpoint and output cap for QC extraction. The 11-field response is well under
+# 600 tokens, so the cap only bounds runaway generations.
+DEFAULT_QC_MODEL = "gpt-4o-mini"
+DEFAULT_QC_BASE_URL = "https://api.openai.com/v1"
+QC_MAX_TOKENS = 600
+
+# Connection pool shared by all QC clients
+QC_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Attempts per publication when the model returns invalid QC output
+QC_MAX_ATTEMPTS = 3
+
+class QCFields(BaseModel):
+    """The 11 QC fields, keyed by their QC_KEYWORDS names in the model output."""
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    nct_number: str = Field(alias="NCT Number")
+    generic_name: str = Field(alias="Generic name")
+    cancer_type: str = Field(alias="Cancer Type")
+    line_of_treatment: str = Field(alias="Line of Treatment")
+    number_of_patients: str = Field(alias="Number of patients")
+    orr: str = Field(alias="Objective response rate (ORR)")
+    pfs: str = Field(alias="Progression free survival (PFS)")
+    os: str = Field(alias="Overall survival (OS)")
+    adverse_events: str = Field(alias="Adverse events (AE)")
+    grade_3_adverse_events: str = Field(alias="Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)")
+    teae_discontinuation: str = Field(alias="Treatment-emergent adverse events (TEAE) led to treatment discontinuation")
+
+class QCResponse(BaseModel):
+    """Top-level QC output: {"qc_fields": {...}}."""
+    model_config = ConfigDict(extra="forbid")
+
+    qc_fields: QCFields
+
+# Structured output format: the API enforces the QCResponse schema server-side
+QC_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "qc_response", "strict": True, "schema": QCResponse.model_json_schema()},
+}
+
+@lru_cache(maxsize=1)
+def build_static_qc_system():
+    """
+    The static QC instructions, up through the publication header.
+
+    Sent as the system message so the identical prefix can be served from the API's
+    prompt cache; the publication text goes in the user message.
+    """
+    fields_block = "\n".join(f"{i}. {field}" for i, field in enumerate(QC_KEYWORDS, 1))
+    return (
+        "You are a clinical expert in competitive intelligence. Extract ONLY the following 11 critical QC fields from the clinical trial publication.\n\n"
         "**QC FIELDS TO EXTRACT:**\n"
-    )
-    for i, field in enumerate(QC_KEYWORDS, 1):
-        prompt += f"{i}. {field}\n"
-    prompt += ("\n**FIELD FORMATTING RULES:**\n"
+        f"{fields_block}\n"
+        "\n**FIELD FORMATTING RULES:**\n"
         "- NCT Number: Must match pattern NCT########.\n"
         "- Generic name: Should be a drug or combo (e.g., Nivolumab + Ipilimumab).\n"
         "- Cancer Type: Must match one of 10 defined melanoma types.\n"
@@ -41,45 +81,105 @@ def generate_qc_prompt(publication_text):
         "- PFS/OS: Numeric (months) or 'NR'.\n"
         "- Adverse events (AE): Single percent.\n"
         "- Grade ≥3 adverse events (AE): Single percent.\n"
-        "- TEAE discontinuation: Percent or 0 if no discontinuation.\n"
-        "\n**REQUIRED JSON OUTPUT FORMAT:**\n"
-        "{\n  'qc_fields': {\n"
+        "- TEAE discontinuation: Percent or 0 if no discontinuation.\n\n"
+        "Publication to Process:\n\n"
+    )
+
+def generate_qc_prompt(publication_text):
+    return build_static_qc_system() + extract_relevant_sections(publication_text)
+
+def parse_qc_content(content):
+    """Validate schema-constrained QC output and return it keyed by the QC field names."""
+    if content is None:
+        raise ValueError("QC response has no content (the model may have refused)")
+    return QCResponse.model_validate_json(content).model_dump(by_alias=True)
+
+@lru_cache(maxsize=None)
+def _shared_client(api_key: str, base_url: str) -> OpenAI:
+    """One OpenAI client (and HTTP connection pool) per API key and endpoint, shared by all QC clients."""
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=2,
+        timeout=60.0,
+        http_client=httpx.Client(limits=QC_HTTP_LIMITS),
     )
-    for i, field in enumerate(QC_KEYWORDS):
-        comma = ',' if i < len(QC_KEYWORDS) - 1 else ''
-        prompt += f"    '{field}': 'value'{comma}\n"
-    prompt += "  }\n}\n\n"
-    prompt += "Publication to Process:\n\n" + publication_text
-    return prompt
 
 class QCOpenAIClient:
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMCache] = None, model: Optional[str] = None, base_url: Optional[str] = None):
+        """
+        Parameters:
+            cache (Optional[LLMCache]): Response cache (defaults to data/llm_cache)
+            model (Optional[str]): Model name (defaults to $QC_MODEL, then gpt-4o-mini)
+            base_url (Optional[str]): API endpoint (defaults to $QC_BASE_URL, then OpenAI); any
+                OpenAI-compatible server with JSON-schema support, e.g. a local vLLM, works
+        """
         self.logger = get_logger(__name__)
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             self.logger.critical("OPENAI_API_KEY environment variable is not set")
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        self.client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
-        self.model = 'gpt-4o-mini'
-        self.max_tokens = 2000
+        base_url = base_url or os.getenv('QC_BASE_URL', DEFAULT_QC_BASE_URL)
+        self.client = _shared_client(api_key, base_url)
+        self.model = model or os.getenv('QC_MODEL', DEFAULT_QC_MODEL)
+        self.max_tokens = QC_MAX_TOKENS
+        self.cache = cache or LLMCache()
+
+    def _request_body(self, publication_text):
+        """Chat completion parameters for one publication."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": build_static_qc_system()},
+                {"role": "user", "content": extract_relevant_sections(publication_text)},
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": 0.1,
+            "response_format": QC_RESPONSE_FORMAT,
+        }
+
+    def _parse_completion(self, completion):
+        """Log cache usage and parse the QC JSON from a chat completion."""
+        content = completion.choices[0].message.content
+        details = getattr(completion.usage, "prompt_tokens_details", None)
+        if details is not None:
+            self.logger.info("Cached prompt tokens: %s of %d", details.cached_tokens, completion.usage.prompt_tokens)
+        self.logger.debug("Raw LLM output: %s", content)
+        return parse_qc_content(content)
 
     @log_performance
     def extract_qc_fields(self, publication_text):
-        prompt = generate_qc_prompt(publication_text)
-        self.logger.info(f"Extracting QC fields from publication (length: {len(publication_text)} chars)")
+        self.logger.info("Extracting QC fields from publication (length: %d chars)", len(publication_text))
+        if not has_nct_number(publication_text):
+            self.logger.warning("No NCT number found in publication; skipping QC extraction.")
+            return {}
+        cache_key = LLMCache.make_key(self.model, QC_PROMPT_VERSION, publication_text)
+        cached = self.cache.get(cache_key)
+        if isinstance(cached, dict):
+            self.logger.info("QC fields served from cache.")
+            return cached
+        if cached is not None:
+            self.cache.delete(cache_key)
+        request_body = self._request_body(publication_text)
         try:
-            messages = [{"role": "user", "content": prompt}]
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=0.1
-            )
-            content = completion.choices[0].message.content
-            self.logger.debug(f"Raw LLM output: {content}")
-            qc_data = json.loads(content)
-            self.logger.info("QC extraction successful.")
-            return qc_data
+            for attempt in range(1, QC_MAX_ATTEMPTS + 1):
+                completion = self.client.chat.completions.create(**request_body)
+                try:
+                    qc_data = self._parse_completion(completion)
+                except ValueError as e:
+                    # Invalid JSON or schema mismatch: show the model its output and the error
+                    if attempt == QC_MAX_ATTEMPTS:
+                        raise
+                    self.logger.warning("QC output invalid on attempt %d/%d: %s", attempt, QC_MAX_ATTEMPTS, e)
+                    request_body["messages"] = request_body["messages"] + [
+                        {"role": "assistant", "content": completion.choices[0].message.content or ""},
+                        {"role": "user", "content": f"Your output had error: {e}. Return ONLY valid JSON matching the schema."},
+                    ]
+                    time.sleep(1.0 * attempt)
+                    continue
+                self.cache.set(cache_key, qc_data, model=self.model)
+                self.logger.info("QC extraction successful.")
+                return qc_data
         except Exception as e:
-            self.logger.error(f"QC extraction failed: {str(e)}", exc_info=True)
-            raise 
\ No newline at end of file
+            self.logger.error("QC extraction failed: %s", e, exc_info=True)
+            raise
@@ -3,9 +3,13 @@ Strategic QC Field Selection Module
 
 This module defines field selection strategies for comprehensive quality control.
 Fields are categorized by clinical importance and extraction complexity.
+
+Field lists are exported as ordered tuples (COMPREHENSIVE_QC_KEYWORDS, TIERn_QC_KEYWORDS);
+use the matching frozensets (COMPREHENSIVE_QC_SET, TIERn_QC_SET) for membership tests.
 """
 
-from typing import Dict, List, Set
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -20,13 +24,15 @@ class ExtractionDifficulty(Enum):
     MEDIUM = "medium"         # Some ambiguity, moderate accuracy
     HARD = "hard"             # Complex patterns, lower accuracy expected
 
-@dataclass
+@dataclass(frozen=True)
 class QCFieldSpec:
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("field_name", "importance", "difficulty", "validation_type", "tolerance", "category")
     field_name: str
     importance: FieldImportance
     difficulty: ExtractionDifficulty
-    validation_type: str
-    tolerance: float
+    validation_type: str  # exact_match, case_insensitive, exact_numeric, numeric_tolerance, percent_tolerance, text_similarity
+    tolerance: float      # absolute for numeric_tolerance, fraction (0.02 = ±2 points) for percent_tolerance, min ratio for text_similarity
     category: str
 
 class StrategicQCFieldSelector:
@@ -42,6 +48,28 @@ class StrategicQCFieldSelector:
     
     def __init__(self):
         self.field_specs = self._define_field_specifications()
+        
+        # Field names grouped by importance and by category, built in one pass
+        by_importance: Dict[FieldImportance, List[str]] = {importance: [] for importance in FieldImportance}
+        by_category: Dict[str, List[str]] = defaultdict(list)
+        for field, spec in self.field_specs.items():
+            by_importance[spec.importance].append(field)
+            by_category[spec.category].append(field)
+        
+        # Frozen as tuples so the shared field lists handed to callers cannot be mutated
+        self._by_importance: Dict[FieldImportance, Tuple[str, ...]] = {
+            importance: tuple(fields) for importance, fields in by_importance.items()
+        }
+        self._by_category: Dict[str, Tuple[str, ...]] = {category: tuple(fields) for category, fields in by_category.items()}
+        self._comprehensive = (
+            self._by_importance[FieldImportance.CRITICAL]
+            + self._by_importance[FieldImportance.HIGH]
+            + self._by_importance[FieldImportance.MEDIUM]
+        )
+        self._importance_sets: Dict[FieldImportance, FrozenSet[str]] = {
+            importance: frozenset(fields) for importance, fields in self._by_importance.items()
+        }
+        self._comprehensive_set = frozenset(self._comprehensive)
     
     def _define_field_specifications(self) -> Dict[str, QCFieldSpec]:
         """Define QC specifications for all fields based on clinical importance and extraction complexity."""
@@ -83,7 +111,7 @@ class StrategicQCFieldSelector:
         # === PRIMARY EFFICACY ENDPOINTS ===
         specs["Objective response rate (ORR)"] = QCFieldSpec(
             "Objective response rate (ORR)", FieldImportance.CRITICAL, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.02, "efficacy"  # ±2%
+            "percent_tolerance", 0.02, "efficacy"  # ±2%
         )
         specs["Progression free survival (PFS)"] = QCFieldSpec(
             "Progression free survival (PFS)", FieldImportance.CRITICAL, ExtractionDifficulty.HARD,
@@ -95,11 +123,11 @@ class StrategicQCFieldSelector:
         )
         specs["Complete Response (CR)"] = QCFieldSpec(
             "Complete Response (CR)", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.02, "efficacy"  # ±2%
+            "percent_tolerance", 0.02, "efficacy"  # ±2%
         )
         specs["Disease Control Rate or DCR"] = QCFieldSpec(
             "Disease Control Rate or DCR", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.02, "efficacy"  # ±2%
+            "percent_tolerance", 0.02, "efficacy"  # ±2%
         )
         
         # === STATISTICAL MEASURES ===
@@ -123,65 +151,65 @@ class StrategicQCFieldSelector:
         # === SURVIVAL RATES AT TIMEPOINTS ===
         specs["Progression free survival (PFS) rate at 12 months"] = QCFieldSpec(
             "Progression free survival (PFS) rate at 12 months", FieldImportance.HIGH, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.05, "survival_rates"  # ±5%
+            "percent_tolerance", 0.05, "survival_rates"  # ±5%
         )
         specs["Overall survival (OS) rate at 12 months"] = QCFieldSpec(
             "Overall survival (OS) rate at 12 months", FieldImportance.HIGH, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.05, "survival_rates"  # ±5%
+            "percent_tolerance", 0.05, "survival_rates"  # ±5%
         )
         specs["Progression free survival (PFS) rate at 24 months"] = QCFieldSpec(
             "Progression free survival (PFS) rate at 24 months", FieldImportance.HIGH, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.05, "survival_rates"  # ±5%
+            "percent_tolerance", 0.05, "survival_rates"  # ±5%
         )
         
         # === PRIMARY SAFETY ENDPOINTS ===
         specs["Adverse events (AE)"] = QCFieldSpec(
             "Adverse events (AE)", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.05, "safety"    # ±5%
+            "percent_tolerance", 0.05, "safety"    # ±5%
         )
         specs["Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)"] = QCFieldSpec(
             "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)", FieldImportance.CRITICAL, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.02, "safety"    # ±2%
+            "percent_tolerance", 0.02, "safety"    # ±2%
         )
         specs["Serious Adverse Events (SAE)"] = QCFieldSpec(
             "Serious Adverse Events (SAE)", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.02, "safety"    # ±2%
+            "percent_tolerance", 0.02, "safety"    # ±2%
         )
         specs["Treatment-emergent adverse events (TEAE) led to treatment discontinuation"] = QCFieldSpec(
             "Treatment-emergent adverse events (TEAE) led to treatment discontinuation", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.02, "safety"    # ±2%
+            "percent_tolerance", 0.02, "safety"    # ±2%
         )
         specs["Adverse Events leading to death"] = QCFieldSpec(
             "Adverse Events leading to death", FieldImportance.HIGH, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.01, "safety"    # ±1%
+            "percent_tolerance", 0.01, "safety"    # ±1%
         )
         
         # === SPECIFIC SAFETY EVENTS ===
         specs["Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Neutropenia"] = QCFieldSpec(
             "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Neutropenia", FieldImportance.MEDIUM, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.03, "specific_safety"
+            "percent_tolerance", 0.03, "specific_safety"
         )
         specs["Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Diarrhea"] = QCFieldSpec(
             "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Diarrhea", FieldImportance.MEDIUM, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.03, "specific_safety"
+            "percent_tolerance", 0.03, "specific_safety"
         )
         specs["Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pneumonitis"] = QCFieldSpec(
             "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 Pneumonitis", FieldImportance.MEDIUM, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.02, "specific_safety"
+            "percent_tolerance", 0.02, "specific_safety"
         )
         
         # === SECONDARY EFFICACY ===
         specs["Pathological Complete Response (pCR)"] = QCFieldSpec(
             "Pathological Complete Response (pCR)", FieldImportance.MEDIUM, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.03, "secondary_efficacy"
+            "percent_tolerance", 0.03, "secondary_efficacy"
         )
         specs["Clinical Benefit Rate (CBR)"] = QCFieldSpec(
             "Clinical Benefit Rate (CBR)", FieldImportance.MEDIUM, ExtractionDifficulty.MEDIUM,
-            "numeric_tolerance", 0.03, "secondary_efficacy"
+            "percent_tolerance", 0.03, "secondary_efficacy"
         )
         specs["Duration of Response (DOR) rate"] = QCFieldSpec(
             "Duration of Response (DOR) rate", FieldImportance.MEDIUM, ExtractionDifficulty.HARD,
-            "numeric_tolerance", 0.05, "secondary_efficacy"
+            "percent_tolerance", 0.05, "secondary_efficacy"
         )
         
         # === TRIAL METADATA ===
@@ -222,53 +250,57 @@ class StrategicQCFieldSelector:
         
         return specs
     
-    def get_tier1_fields(self) -> List[str]:
+    def get_tier1_fields(self) -> Tuple[str, ...]:
         """Get Tier 1 QC fields (CRITICAL importance)."""
-        return [field for field, spec in self.field_specs.items() 
-                if spec.importance == FieldImportance.CRITICAL]
+        return self._by_importance[FieldImportance.CRITICAL]
     
-    def get_tier2_fields(self) -> List[str]:
+    def get_tier2_fields(self) -> Tuple[str, ...]:
         """Get Tier 2 QC fields (HIGH importance)."""
-        return [field for field, spec in self.field_specs.items() 
-                if spec.importance == FieldImportance.HIGH]
+        return self._by_importance[FieldImportance.HIGH]
     
-    def get_tier3_fields(self) -> List[str]:
+    def get_tier3_fields(self) -> Tuple[str, ...]:
         """Get Tier 3 QC fields (MEDIUM importance)."""
-        return [field for field, spec in self.field_specs.items() 
-                if spec.importance == FieldImportance.MEDIUM]
+        return self._by_importance[FieldImportance.MEDIUM]
     
-    def get_comprehensive_qc_fields(self) -> List[str]:
+    def get_comprehensive_qc_fields(self) -> Tuple[str, ...]:
         """Get comprehensive QC field list (Tier 1 + Tier 2 + selected Tier 3)."""
-        tier1 = self.get_tier1_fields()
-        tier2 = self.get_tier2_fields()
-        tier3 = self.get_tier3_fields()
-        
-        # Return all tiers for comprehensive validation
-        return tier1 + tier2 + tier3
+        # All tiers for comprehensive validation, combined once at construction
+        return self._comprehensive
+    
+    def get_tier1_set(self) -> FrozenSet[str]:
+        """Get Tier 1 QC fields as a set, for membership tests."""
+        return self._importance_sets[FieldImportance.CRITICAL]
+    
+    def get_tier2_set(self) -> FrozenSet[str]:
+        """Get Tier 2 QC fields as a set, for membership tests."""
+        return self._importance_sets[FieldImportance.HIGH]
+    
+    def get_tier3_set(self) -> FrozenSet[str]:
+        """Get Tier 3 QC fields as a set, for membership tests."""
+        return self._importance_sets[FieldImportance.MEDIUM]
+    
+    def get_comprehensive_qc_set(self) -> FrozenSet[str]:
+        """Get comprehensive QC fields as a set, for membership tests."""
+        return self._comprehensive_set
     
     def get_field_spec(self, field_name: str) -> QCFieldSpec:
         """Get field specification for validation."""
         return self.field_specs.get(field_name)
     
-    def get_fields_by_category(self, category: str) -> List[str]:
+    def get_fields_by_category(self, category: str) -> Tuple[str, ...]:
         """Get fields by category."""
-        return [field for field, spec in self.field_specs.items() 
-                if spec.category == category]
+        return self._by_category.get(category, ())
     
     def get_validation_summary(self) -> Dict[str, int]:
         """Get summary of field counts by importance and category."""
         summary = {
             "total_fields": len(self.field_specs),
-            "critical": len(self.get_tier1_fields()),
-            "high": len(self.get_tier2_fields()),
-            "medium": len(self.get_tier3_fields()),
-            "by_category": {}
+            "critical": len(self._by_importance[FieldImportance.CRITICAL]),
+            "high": len(self._by_importance[FieldImportance.HIGH]),
+            "medium": len(self._by_importance[FieldImportance.MEDIUM]),
+            "by_category": {category: len(fields) for category, fields in self._by_category.items()}
         }
         
-        categories = set(spec.category for spec in self.field_specs.values())
-        for category in categories:
-            summary["by_category"][category] = len(self.get_fields_by_category(category))
-        
         return summary
 
 # Initialize global selector
@@ -277,7 +309,29 @@ QC_FIELD_SELECTOR = StrategicQCFieldSelector()
 # Export comprehensive QC fields list
 COMPREHENSIVE_QC_KEYWORDS = QC_FIELD_SELECTOR.get_comprehensive_qc_fields()
 
+# Fields extracted by the QC pass and compared by QCValidator, named as in the main extraction
+QC_KEYWORDS: Tuple[str, ...] = (
+    "NCT Number",
+    "Generic name",
+    "Cancer Type",
+    "Line of Treatment",
+    "Number of patients",
+    "Objective response rate (ORR)",
+    "Progression free survival (PFS)",
+    "Overall survival (OS)",
+    "Adverse events (AE)",
+    "Grade ≥3 or Grade 3+ or Grade 3-5 or Grade 3-4 higher adverse events (AE)",
+    "Treatment-emergent adverse events (TEAE) led to treatment discontinuation",
+)
+assert all(field in QC_FIELD_SELECTOR.field_specs for field in QC_KEYWORDS)
+
 # Export tiered field lists  
 TIER1_QC_KEYWORDS = QC_FIELD_SELECTOR.get_tier1_fields()  # Critical
 TIER2_QC_KEYWORDS = QC_FIELD_SELECTOR.get_tier2_fields()  # High  
-TIER3_QC_KEYWORDS = QC_FIELD_SELECTOR.get_tier3_fields()  # Medium 
\ No newline at end of file
+TIER3_QC_KEYWORDS = QC_FIELD_SELECTOR.get_tier3_fields()  # Medium 
+
+# Export set views of the same fields for O(1) membership tests
+COMPREHENSIVE_QC_SET = QC_FIELD_SELECTOR.get_comprehensive_qc_set()
+TIER1_QC_SET = QC_FIELD_SELECTOR.get_tier1_set()
+TIER2_QC_SET = QC_FIELD_SELECTOR.get_tier2_set()
+TIER3_QC_SET = QC_FIELD_SELECTOR.get_tier3_set()
\ No newline at end of file
@@ -1,25 +1,13 @@
+import bisect
+import difflib
 import logging
+import os
+import re
 from src.logger_config import get_logger, log_performance
+from src.qc_field_selector import QC_FIELD_SELECTOR, QC_KEYWORDS
 from typing import Dict, Any, Tuple
 
-QC_TOLERANCES = {
-    'percent': 0.5,   # ±0.5% for percentages
-    'months': 0.1     # ±0.1 months for survival data
-}
-
-QC_KEYWORDS = [
-    "NCT Number",
-    "Generic name",
-    "Cancer Type",
-    "Line of Treatment",
-    "Number of patients",
-    "Objective response rate (ORR)",
-    "Progression free survival (PFS)",
-    "Overall survival (OS)",
-    "Adverse events (AE)",
-    "Grade ≥3 adverse events (AE)",
-    "Treatment emergent adverse events (TEAE) led to treatment discontinuation"
-]
+_NCT_RE = re.compile(r"NCT\d{8}")
 
 COLOR_RULES = [
     (1.0, 'Green'),    # 100%
@@ -27,72 +15,124 @@ COLOR_RULES = [
     (0.0, 'Red')      # <75%
 ]
 
-def _is_float(val):
+# COLOR_RULES in ascending threshold order, for bisect lookup
+_COLOR_THRESHOLDS = [threshold for threshold, _ in reversed(COLOR_RULES)]
+_COLOR_NAMES = [color for _, color in reversed(COLOR_RULES)]
+
+def _try_float(val):
+    """Parse val as a float once; None if it is not numeric."""
     try:
-        float(val)
-        return True
-    except Exception:
-        return False
+        return float(val)
+    except (TypeError, ValueError):
+        return None
 
-def _compare_values(val1, val2, field):
+def _as_str(val):
+    """Normalize a row value to a string once, so comparators can use string methods."""
+    if val is None:
+        return ""
+    return val if isinstance(val, str) else str(val)
+
+def _both_nr(val1, val2):
+    # Not reached / not reported on both sides
+    return val1.strip().upper() == 'NR' and val2.strip().upper() == 'NR'
+
+def _cmp_nct(val1, val2):
     # NCT Number: must match pattern
-    if field == "NCT Number":
-        import re
-        pattern = r"NCT\\d{8}"
-        return bool(val1) and bool(val2) and val1 == val2 and re.match(pattern, val1)
-    # Generic name: exact match (case-insensitive, strip)
-    if field == "Generic name":
-        return val1.strip().lower() == val2.strip().lower()
-    # Cancer Type: exact match (case-insensitive)
-    if field == "Cancer Type":
-        return val1.strip().lower() == val2.strip().lower()
-    # Line of Treatment: exact match
-    if field == "Line of Treatment":
-        return val1.strip().lower() == val2.strip().lower()
-    # Number of patients: numeric, exact
-    if field == "Number of patients":
-        return _is_float(val1) and _is_float(val2) and float(val1) == float(val2)
-    # Percentages: tolerance ±0.5
-    if field in ["Objective response rate (ORR)", "Adverse events (AE)", "Grade ≥3 adverse events (AE)", "Treatment emergent adverse events (TEAE) led to treatment discontinuation"]:
-        if _is_float(val1) and _is_float(val2):
-            return abs(float(val1) - float(val2)) <= QC_TOLERANCES['percent']
-        return False
-    # Survival: tolerance ±0.1 or NR
-    if field in ["Progression free survival (PFS)", "Overall survival (OS)"]:
-        if str(val1).strip().upper() == 'NR' and str(val2).strip().upper() == 'NR':
-            return True
-        if _is_float(val1) and _is_float(val2):
-            return abs(float(val1) - float(val2)) <= QC_TOLERANCES['months']
-        return False
+    return bool(val1) and val1 == val2 and _NCT_RE.match(val1) is not None
+
+def _cmp_exact(val1, val2):
+    # Exact match (strip)
+    return bool(val1.strip()) and val1.strip() == val2.strip()
+
+def _cmp_case_insensitive(val1, val2):
+    # Exact match (case-insensitive, strip)
+    return val1.strip().lower() == val2.strip().lower()
+
+def _cmp_exact_numeric(val1, val2):
+    # Numeric, exact
+    num1, num2 = _try_float(val1), _try_float(val2)
+    return num1 is not None and num2 is not None and num1 == num2
+
+def _cmp_numeric_tol(tolerance):
+    """Build a comparator matching two numeric values within ±tolerance (or both NR)."""
+    def compare(val1, val2):
+        num1, num2 = _try_float(val1), _try_float(val2)
+        if num1 is not None and num2 is not None:
+            return abs(num1 - num2) <= tolerance
+        return _both_nr(val1, val2)
+    return compare
+
+def _cmp_text_similarity(threshold):
+    """Build a comparator matching two texts whose similarity ratio is at least threshold."""
+    def compare(val1, val2):
+        return difflib.SequenceMatcher(None, val1.strip().lower(), val2.strip().lower()).ratio() >= threshold
+    return compare
+
+def _cmp_default(val1, val2):
+    # Fields without a field spec: plain equality
     return val1 == val2
 
+# Comparator factories by QCFieldSpec.validation_type. Percentages are compared in
+# percentage points, so a percent_tolerance of 0.02 allows ±2.
+_SPEC_COMPARATORS = {
+    "exact_match": lambda spec: _cmp_exact,
+    "case_insensitive": lambda spec: _cmp_case_insensitive,
+    "exact_numeric": lambda spec: _cmp_exact_numeric,
+    "numeric_tolerance": lambda spec: _cmp_numeric_tol(spec.tolerance),
+    "percent_tolerance": lambda spec: _cmp_numeric_tol(spec.tolerance * 100),
+    "text_similarity": lambda spec: _cmp_text_similarity(spec.tolerance),
+}
+
+# Rules stricter than the field's validation_type
+_FIELD_OVERRIDES = {"NCT Number": _cmp_nct}
+
+def _comparator_for(field):
+    """Resolve the comparator for a field from its QCFieldSpec."""
+    if field in _FIELD_OVERRIDES:
+        return _FIELD_OVERRIDES[field]
+    spec = QC_FIELD_SELECTOR.get_field_spec(field)
+    return _SPEC_COMPARATORS[spec.validation_type](spec) if spec else _cmp_default
+
+_FIELD_COMPARATORS = {field: _comparator_for(field) for field in QC_KEYWORDS}
+
+def _compare_values(val1, val2, field):
+    """Compare two string values of a QC field using the field's comparison rule."""
+    return _FIELD_COMPARATORS.get(field, _cmp_default)(val1, val2)
+
 def _assign_color(match_ratio: float) -> str:
-    for threshold, color in COLOR_RULES:
-        if match_ratio >= threshold:
-            return color
-    return 'Red'
+    # Index of the highest threshold <= match_ratio; ratios below every threshold are Red
+    index = bisect.bisect_right(_COLOR_THRESHOLDS, match_ratio) - 1
+    return _COLOR_NAMES[index] if index >= 0 else 'Red'
 
 class QCValidator:
     def __init__(self):
         self.logger = get_logger(__name__)
+        # Comparator per QC field, resolved once instead of on every row
+        self._comparators = [(field, _FIELD_COMPARATORS[field]) for field in QC_KEYWORDS]
 
-    @log_performance
-    def validate(self, main_row: Dict[str, Any], qc_row: Dict[str, Any]) -> Tuple[float, str, Dict[str, bool]]:
+    def _validate_one(self, main_row: Dict[str, Any], qc_row: Dict[str, Any]) -> Tuple[float, str, Dict[str, bool]]:
         """
         Compare main extraction row with QC row. Return (match_ratio, color, field_results)
         """
         matches = 0
         field_results = {}
-        for field in QC_KEYWORDS:
-            main_val = main_row.get(field, "")
-            qc_val = qc_row.get(field, "")
-            result = _compare_values(main_val, qc_val, field)
+        mismatches = []
+        for field, compare in self._comparators:
+            main_val = _as_str(main_row.get(field, ""))
+            qc_val = _as_str(qc_row.get(field, ""))
+            result = compare(main_val, qc_val)
             field_results[field] = result
             if result:
                 matches += 1
             else:
-                self.logger.debug(f"Mismatch in field '{field}': main='{main_val}' qc='{qc_val}'")
+                mismatches.append((field, main_val, qc_val))
+        if mismatches and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("QC mismatches (field, main, qc): %s", mismatches)
         match_ratio = matches / len(QC_KEYWORDS)
         color = _assign_color(match_ratio)
-        self.logger.info(f"QC match: {matches}/{len(QC_KEYWORDS)} ({match_ratio*100:.1f}%) - {color}")
-        return match_ratio, color, field_results 
\ No newline at end of file
+        self.logger.info("QC match: %d/%d (%.1f%%) - %s", matches, len(QC_KEYWORDS), match_ratio * 100, color)
+        return match_ratio, color, field_results
+
+    # validate runs once per trial and the per-call timing logs outweigh the comparisons,
+    # so the log_performance wrapper is only applied when QC_PROFILE is set
+    validate = log_performance(_validate_one) if os.environ.get("QC_PROFILE") else _validate_one
@@ -1,7 +1,13 @@
+import atexit
+import json
 import logging
 import os
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import ChainMap
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -10,6 +16,13 @@ logger = logging.getLogger(__name__)
 # Path to your database file
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "database", "doctorci.db")
 
+# JSON record of processed PDFs used before the ProcessedFiles table; imported when the table is created
+LEGACY_PROCESSED_FILES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "processed_files.json")
+
+# Whether the database directory exists and journal_mode=WAL has been applied, in this process
+_db_dir_ready = False
+_wal_enabled = False
+
 
 def create_connection() -> sqlite3.Connection:
     """
@@ -21,14 +34,231 @@ def create_connection() -> sqlite3.Connection:
     Raises:
         sqlite3.Error: If connection fails
     """
+    global _db_dir_ready, _wal_enabled
     try:
-        # Ensure database directory exists
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        conn = sqlite3.connect(DB_PATH)
+        # Ensure database directory exists (once per process)
+        if not _db_dir_ready:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            _db_dir_ready = True
+        # Connections may be closed from the exit handler on another thread; a larger
+        # statement cache keeps every repository statement compiled for reuse
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+        # Rows support both index and column-name access
+        conn.row_factory = sqlite3.Row
+        if not _wal_enabled:
+            # WAL lets readers proceed while abstracts are being inserted; it is stored in
+            # the database file, so it only needs setting once per process
+            conn.execute("PRAGMA journal_mode=WAL;")
+            _wal_enabled = True
+        # Per-connection settings: fsync only at checkpoints, in-memory temp tables,
+        # 256 MB memory-mapped reads, 64 MB page cache, wait up to 5 s on a locked database
+        conn.executescript(
+            """
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=5000;
+            """
+        )
         return conn
     except sqlite3.Error as e:
-        logger.error(f"Error connecting to database: {e}")
+        logger.error("Error connecting to database: %s", e)
+        raise
+
+
+# One long-lived connection per thread, so SQLite's page cache stays warm between calls
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return this thread's persistent database connection, opening it on first use.
+
+    Connections are reused for the life of the process and closed at exit; callers
+    commit or roll back their own work but never close the connection.
+
+    Returns:
+        sqlite3.Connection: Database connection object
+
+    Raises:
+        sqlite3.Error: If connection fails
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = create_connection()
+        _local.conn = conn
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+
+@atexit.register
+def close_connections() -> None:
+    """Close every connection opened by get_connection."""
+    global _local
+    with _connections_lock:
+        while _connections:
+            _connections.pop().close()
+        _local = threading.local()
+
+
+def _in_abstract_transaction() -> bool:
+    return getattr(_local, "in_transaction", False)
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    """Commit, unless the write belongs to an enclosing abstract_transaction."""
+    if not _in_abstract_transaction():
+        conn.commit()
+
+
+def _rollback(conn: sqlite3.Connection) -> None:
+    """Roll back, unless an enclosing abstract_transaction will decide on exit."""
+    if not _in_abstract_transaction():
+        conn.rollback()
+
+
+@contextmanager
+def _write(conn: sqlite3.Connection) -> Iterator[None]:
+    """Like `with conn:`, but deferring to an enclosing abstract_transaction."""
+    if _in_abstract_transaction():
+        yield
+    else:
+        with conn:
+            yield
+
+
+@contextmanager
+def abstract_transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Run all repository writes for one abstract in a single transaction.
+
+    Inside the block the insert and link functions skip their own commits; everything
+    is committed together on exit, or rolled back if the block raises. Nested blocks
+    join the outer transaction.
+
+    Returns:
+        Iterator[sqlite3.Connection]: This thread's connection
+
+    Raises:
+        sqlite3.Error: If the transaction cannot be started or committed
+    """
+    conn = get_connection()
+    if _in_abstract_transaction():
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    _local.in_transaction = True
+    _local.pending_names = {}
+    try:
+        yield conn
+        conn.commit()
+        # The transaction's lookup-table ids are committed; share them with other threads
+        for table, names in _local.pending_names.items():
+            _name_caches.setdefault(table, {}).update(names)
+    except BaseException:
+        # Ids of rows inserted in this transaction no longer exist; they were never shared
+        conn.rollback()
         raise
+    finally:
+        _local.in_transaction = False
+        _local.pending_names = {}
+
+
+# Hot statements, shared by the single-row and bulk functions so each is compiled once
+# per connection and then served from its statement cache
+_INSERT_ABSTRACT = "INSERT INTO Abstracts (file_name, abstract_text) VALUES (?, ?)"
+_INSERT_DRUG_ATTRIBUTE = (
+    "INSERT INTO DrugAttributes (drug_id, attribute_id, abstract_id, attribute_value, attribute_units) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_LINK_ABSTRACT_DRUG = "INSERT OR IGNORE INTO AbstractDrugs (abstract_id, drug_id) VALUES (?, ?)"
+_LINK_DRUG_DISEASE = "INSERT OR IGNORE INTO DrugDiseases (drug_id, disease_id) VALUES (?, ?)"
+_MARK_FILE = (
+    "INSERT INTO ProcessedFiles (file_name, status) VALUES (?, ?) "
+    "ON CONFLICT(file_name) DO UPDATE SET status = excluded.status, created_at = CURRENT_TIMESTAMP"
+)
+
+# SQLite's default cap on host parameters per statement (SQLITE_MAX_VARIABLE_NUMBER before 3.32)
+_MAX_SQL_PARAMS = 999
+
+
+def _multirow_insert(conn: sqlite3.Connection, statement: str, rows: Iterable[Tuple[Any, ...]]) -> int:
+    """
+    Run a single-row "INSERT ... VALUES (?, ...)" statement for many rows as multi-row
+    INSERTs, packing as many rows into each as the parameter limit allows.
+
+    Returns:
+        int: Number of rows submitted
+    """
+    prefix, _, placeholders = statement.rpartition(" VALUES ")
+    batch_size = _MAX_SQL_PARAMS // placeholders.count("?")
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        conn.execute(f"{prefix} VALUES {', '.join([placeholders] * len(batch))}", [value for row in batch for value in row])
+    return len(rows)
+
+
+# Insert a name, or return the existing row's id if another connection already added it.
+# The no-op DO UPDATE makes RETURNING produce the id on the conflict path too (SQLite 3.35+).
+_UPSERT_DRUGS = (
+    "INSERT INTO Drugs (drug_name) VALUES (?) "
+    "ON CONFLICT(drug_name) DO UPDATE SET drug_name = excluded.drug_name RETURNING drug_id"
+)
+_UPSERT_DISEASES = (
+    "INSERT INTO Diseases (disease_name) VALUES (?) "
+    "ON CONFLICT(disease_name) DO UPDATE SET disease_name = excluded.disease_name RETURNING disease_id"
+)
+_UPSERT_ATTRIBUTES = (
+    "INSERT INTO Attributes (attribute_name) VALUES (?) "
+    "ON CONFLICT(attribute_name) DO UPDATE SET attribute_name = excluded.attribute_name RETURNING attribute_id"
+)
+
+# name -> id maps for the Drugs, Diseases and Attributes lookup tables, loaded from the
+# database on first use and kept in step with inserts, so known names need no query.
+# Shared by all threads, so they only ever hold committed rows.
+_name_caches: Dict[str, Dict[str, int]] = {}
+
+
+def _name_cache(conn: sqlite3.Connection, table: str, id_column: str, name_column: str) -> MutableMapping[str, int]:
+    """
+    Return the name -> id map for a lookup table, loading it on first use.
+
+    Inside an abstract_transaction, new entries (and a map loaded mid-transaction, which
+    can include the transaction's own rows) go to this thread's pending map, which
+    abstract_transaction publishes to _name_caches only once the transaction commits.
+    """
+    cache = _name_caches.get(table)
+    if not _in_abstract_transaction():
+        if cache is None:
+            cache = {name: row_id for row_id, name in conn.execute(f"SELECT {id_column}, {name_column} FROM {table}")}
+            _name_caches[table] = cache
+        return cache
+
+    pending = _local.pending_names
+    if table not in pending:
+        pending[table] = {} if cache is not None else {
+            name: row_id for row_id, name in conn.execute(f"SELECT {id_column}, {name_column} FROM {table}")
+        }
+    return ChainMap(pending[table], cache if cache is not None else {})
+
+
+# Tables created by create_tables, in foreign-key order (referencing tables first)
+_TABLES = (
+    "DrugAttributes",
+    "DrugDiseases",
+    "AbstractDrugs",
+    "ProcessedFiles",
+    "Drugs",
+    "Diseases",
+    "Attributes",
+    "Abstracts",
+)
 
 
 def create_tables() -> None:
@@ -38,8 +268,8 @@ def create_tables() -> None:
     Raises:
         sqlite3.Error: If table creation fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
 
         # Create Abstracts table
@@ -133,13 +363,92 @@ def create_tables() -> None:
         """
         )
 
-        conn.commit()
+        # Create ProcessedFiles table (PDFs already handled, status 'processed' or 'failed')
+        cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS ProcessedFiles (
+            file_name TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'processed',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+        )
+
+        # Indexes for lookups by foreign key; the name columns and link-table primary keys
+        # are already indexed by their UNIQUE / PRIMARY KEY constraints
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_drug_attributes_drug ON DrugAttributes (drug_id, attribute_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_drug_attributes_abstract ON DrugAttributes (abstract_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_abstract_drugs_drug ON AbstractDrugs (drug_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_drug_diseases_disease ON DrugDiseases (disease_id)")
+
+        _commit(conn)
         logger.info("Database tables created successfully")
     except sqlite3.Error as e:
-        logger.error(f"Error creating tables: {e}")
+        logger.error("Error creating tables: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
+
+
+@lru_cache(maxsize=1)
+def ensure_tables() -> None:
+    """
+    Create the database tables once per process.
+
+    When this creates the ProcessedFiles table, the legacy processed-files record is
+    imported into it, so the import happens once per database. Repeated calls are
+    no-ops, so callers can invoke this freely at startup.
+
+    Raises:
+        sqlite3.Error: If table creation fails
+    """
+    conn = get_connection()
+    is_new = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ProcessedFiles'").fetchone() is None
+    create_tables()
+    if is_new:
+        import_legacy_processed_files()
+
+
+def import_legacy_processed_files(json_path: str = LEGACY_PROCESSED_FILES_PATH) -> int:
+    """
+    Import data/processed_files.json into the ProcessedFiles table.
+
+    Both formats of the old record are understood: a plain list of file names
+    (PDFProcessor) and the tracking dict with processed_files / failed_files lists
+    (main.py). The file itself is left in place.
+
+    Parameters:
+        json_path (str): Path to the legacy JSON record
+
+    Returns:
+        int: Number of file names imported
+
+    Raises:
+        sqlite3.Error: If insertion fails
+    """
+    if not os.path.exists(json_path):
+        return 0
+    try:
+        with open(json_path, "r") as f:
+            record = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error("Error reading legacy processed files record %s: %s", json_path, e)
+        return 0
+
+    if isinstance(record, dict):
+        rows = [(name, "processed") for name in record.get("processed_files", [])]
+        rows += [(name, "failed") for name in record.get("failed_files", [])]
+    else:
+        rows = [(name, "processed") for name in record]
+
+    conn = get_connection()
+    try:
+        with _write(conn):
+            conn.executemany(_MARK_FILE, rows)
+    except sqlite3.Error as e:
+        logger.error("Error importing legacy processed files: %s", e)
+        raise
+    logger.info("Imported %d file names from %s", len(rows), json_path)
+    return len(rows)
 
 
 def insert_abstract(file_name: str, abstract_text: str) -> int:
@@ -156,27 +465,131 @@ def insert_abstract(file_name: str, abstract_text: str) -> int:
     Raises:
         sqlite3.Error: If insertion fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-        INSERT INTO Abstracts (file_name, abstract_text)
-        VALUES (?, ?)
-        """,
-            (file_name, abstract_text),
-        )
+        cursor.execute(_INSERT_ABSTRACT, (file_name, abstract_text))
 
         abstract_id = cursor.lastrowid
-        conn.commit()
-        logger.info(f"Inserted abstract for file: {file_name}")
+        _commit(conn)
+        logger.info("Inserted abstract for file: %s", file_name)
         return abstract_id
     except sqlite3.Error as e:
-        logger.error(f"Error inserting abstract: {e}")
+        logger.error("Error inserting abstract: %s", e)
+        _rollback(conn)
+        raise
+
+
+def insert_abstracts_bulk(rows: List[Tuple[str, str]], processed_file_names: Iterable[str] = ()) -> None:
+    """
+    Insert many abstracts in a single transaction and mark their files as processed.
+
+    Parameters:
+        rows (List[Tuple[str, str]]): (file_name, abstract_text) pairs to insert
+        processed_file_names (Iterable[str]): File names to record in ProcessedFiles
+
+    Raises:
+        sqlite3.Error: If insertion fails (nothing is committed)
+    """
+    conn = get_connection()
+    try:
+        with _write(conn):
+            conn.executemany(_INSERT_ABSTRACT, rows)
+            conn.executemany(_MARK_FILE, ((file_name, "processed") for file_name in processed_file_names))
+        logger.info("Inserted %d abstracts", len(rows))
+    except sqlite3.Error as e:
+        logger.error("Error inserting abstracts: %s", e)
+        _rollback(conn)
+        raise
+
+
+def get_processed_files(status: str = "processed") -> Set[str]:
+    """
+    Retrieve the names of PDF files recorded in the ProcessedFiles table.
+
+    Parameters:
+        status (str): 'processed' for files handled successfully, 'failed' for failures
+
+    Returns:
+        Set[str]: Names of files with that status
+
+    Raises:
+        sqlite3.Error: If retrieval fails
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT file_name FROM ProcessedFiles WHERE status = ?", (status,))
+        return {row[0] for row in cursor.fetchall()}
+    except sqlite3.Error as e:
+        logger.error("Error retrieving processed files: %s", e)
+        raise
+
+
+def mark_file_processed(file_name: str, success: bool = True) -> None:
+    """
+    Record a PDF file as processed (or failed) in the ProcessedFiles table.
+
+    Parameters:
+        file_name (str): Name of the PDF file
+        success (bool): False to record the file as failed
+
+    Raises:
+        sqlite3.Error: If insertion fails
+    """
+    conn = get_connection()
+    try:
+        conn.execute(_MARK_FILE, (file_name, "processed" if success else "failed"))
+        _commit(conn)
+    except sqlite3.Error as e:
+        logger.error("Error recording processed file: %s", e)
+        _rollback(conn)
+        raise
+
+
+def get_processed_files_summary() -> Dict[str, Any]:
+    """
+    Summarize the ProcessedFiles table.
+
+    Returns:
+        Dict[str, Any]: total_processed, total_failed and last_processed (timestamp of the
+            latest successful file, or None)
+
+    Raises:
+        sqlite3.Error: If retrieval fails
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            """
+        SELECT COALESCE(SUM(status = 'processed'), 0) AS total_processed,
+               COALESCE(SUM(status = 'failed'), 0) AS total_failed,
+               MAX(CASE WHEN status = 'processed' THEN created_at END) AS last_processed
+        FROM ProcessedFiles
+        """
+        ).fetchone()
+        return dict(row)
+    except sqlite3.Error as e:
+        logger.error("Error summarizing processed files: %s", e)
+        raise
+
+
+def clear_processed_files() -> None:
+    """
+    Forget all processed and failed files, so every PDF is picked up again.
+
+    Raises:
+        sqlite3.Error: If clearing fails
+    """
+    conn = get_connection()
+    try:
+        with _write(conn):
+            conn.execute("DELETE FROM ProcessedFiles")
+        logger.info("Cleared processed file names from tracking")
+    except sqlite3.Error as e:
+        logger.error("Error clearing processed files: %s", e)
         raise
-    finally:
-        conn.close()
 
 
 def insert_drug(drug_name: str) -> int:
@@ -192,66 +605,55 @@ def insert_drug(drug_name: str) -> int:
     Raises:
         sqlite3.Error: If insertion fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-
         # Check if drug exists
-        cursor.execute("SELECT drug_id FROM Drugs WHERE drug_name = ?", (drug_name,))
-        result = cursor.fetchone()
+        drug_ids = _name_cache(conn, "Drugs", "drug_id", "drug_name")
+        drug_id = drug_ids.get(drug_name)
 
-        if result:
-            drug_id = result[0]
-            logger.debug(f"Drug '{drug_name}' already exists with ID: {drug_id}")
+        if drug_id is not None:
+            logger.debug("Drug '%s' already exists with ID: %s", drug_name, drug_id)
         else:
-            cursor.execute("INSERT INTO Drugs (drug_name) VALUES (?)", (drug_name,))
-            drug_id = cursor.lastrowid
-            conn.commit()
-            logger.info(f"Inserted new drug: {drug_name}")
+            cursor = conn.cursor()
+            cursor.execute(_UPSERT_DRUGS, (drug_name,))
+            drug_id = cursor.fetchone()[0]
+            _commit(conn)
+            drug_ids[drug_name] = drug_id
+            logger.info("Inserted new drug: %s", drug_name)
 
         return drug_id
     except sqlite3.Error as e:
-        logger.error(f"Error inserting drug: {e}")
+        logger.error("Error inserting drug: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
 
 
 def insert_disease(disease_name):
     """Insert a disease into the Diseases table and return its disease_id."""
-    conn = create_connection()
-    cursor = conn.cursor()
+    conn = get_connection()
 
     # Check if the disease already exists
-    cursor.execute("SELECT disease_id FROM Diseases WHERE disease_name = ?", (disease_name,))
-    result = cursor.fetchone()
+    disease_ids = _name_cache(conn, "Diseases", "disease_id", "disease_name")
+    disease_id = disease_ids.get(disease_name)
 
-    if result:
-        disease_id = result[0]
-    else:
-        cursor.execute("INSERT INTO Diseases (disease_name) VALUES (?)", (disease_name,))
-        conn.commit()
-        disease_id = cursor.lastrowid
+    if disease_id is None:
+        cursor = conn.cursor()
+        cursor.execute(_UPSERT_DISEASES, (disease_name,))
+        disease_id = cursor.fetchone()[0]
+        _commit(conn)
+        disease_ids[disease_name] = disease_id
 
-    conn.close()
     return disease_id
 
 
 def link_drug_disease(drug_id, disease_id):
     """Link a drug to a disease in the DrugDiseases table."""
-    conn = create_connection()
+    conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute(
-        """
-    INSERT OR IGNORE INTO DrugDiseases (drug_id, disease_id)
-    VALUES (?, ?)
-    """,
-        (drug_id, disease_id),
-    )
+    cursor.execute(_LINK_DRUG_DISEASE, (drug_id, disease_id))
 
-    conn.commit()
-    conn.close()
+    _commit(conn)
 
 
 def insert_attribute(attribute_name: str) -> int:
@@ -267,29 +669,27 @@ def insert_attribute(attribute_name: str) -> int:
     Raises:
         sqlite3.Error: If insertion fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-
         # Check if attribute exists
-        cursor.execute("SELECT attribute_id FROM Attributes WHERE attribute_name = ?", (attribute_name,))
-        result = cursor.fetchone()
+        attribute_ids = _name_cache(conn, "Attributes", "attribute_id", "attribute_name")
+        attribute_id = attribute_ids.get(attribute_name)
 
-        if result:
-            attribute_id = result[0]
-            logger.debug(f"Attribute '{attribute_name}' already exists with ID: {attribute_id}")
+        if attribute_id is not None:
+            logger.debug("Attribute '%s' already exists with ID: %s", attribute_name, attribute_id)
         else:
-            cursor.execute("INSERT INTO Attributes (attribute_name) VALUES (?)", (attribute_name,))
-            attribute_id = cursor.lastrowid
-            conn.commit()
-            logger.info(f"Inserted new attribute: {attribute_name}")
+            cursor = conn.cursor()
+            cursor.execute(_UPSERT_ATTRIBUTES, (attribute_name,))
+            attribute_id = cursor.fetchone()[0]
+            _commit(conn)
+            attribute_ids[attribute_name] = attribute_id
+            logger.info("Inserted new attribute: %s", attribute_name)
 
         return attribute_id
     except sqlite3.Error as e:
-        logger.error(f"Error inserting attribute: {e}")
+        logger.error("Error inserting attribute: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
 
 
 def insert_drug_attribute(
@@ -308,25 +708,77 @@ def insert_drug_attribute(
     Raises:
         sqlite3.Error: If insertion fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-        INSERT INTO DrugAttributes (drug_id, attribute_id, abstract_id, attribute_value, attribute_units)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-            (drug_id, attribute_id, abstract_id, attribute_value, attribute_units),
-        )
+        cursor.execute(_INSERT_DRUG_ATTRIBUTE, (drug_id, attribute_id, abstract_id, attribute_value, attribute_units))
 
-        conn.commit()
-        logger.debug(f"Inserted drug attribute for drug_id: {drug_id}, attribute_id: {attribute_id}")
+        _commit(conn)
+        logger.debug("Inserted drug attribute for drug_id: %s, attribute_id: %s", drug_id, attribute_id)
     except sqlite3.Error as e:
-        logger.error(f"Error inserting drug attribute: {e}")
+        logger.error("Error inserting drug attribute: %s", e)
+        _rollback(conn)
+        raise
+
+
+def insert_drug_attributes_bulk(rows: Iterable[Tuple[int, int, int, str, Optional[str]]]) -> None:
+    """
+    Insert many drug attributes in a single transaction.
+
+    Parameters:
+        rows (Iterable[Tuple[int, int, int, str, Optional[str]]]):
+            (drug_id, attribute_id, abstract_id, attribute_value, attribute_units) tuples
+
+    Raises:
+        sqlite3.Error: If insertion fails (nothing is committed)
+    """
+    conn = get_connection()
+    try:
+        with _write(conn):
+            inserted = _multirow_insert(conn, _INSERT_DRUG_ATTRIBUTE, rows)
+        logger.debug("Inserted %d drug attributes", inserted)
+    except sqlite3.Error as e:
+        logger.error("Error inserting drug attributes: %s", e)
+        raise
+
+
+def link_abstract_drugs_bulk(rows: Iterable[Tuple[int, int]]) -> None:
+    """
+    Link many abstracts to drugs in a single transaction.
+
+    Parameters:
+        rows (Iterable[Tuple[int, int]]): (abstract_id, drug_id) pairs
+
+    Raises:
+        sqlite3.Error: If linking fails (nothing is committed)
+    """
+    conn = get_connection()
+    try:
+        with _write(conn):
+            _multirow_insert(conn, _LINK_ABSTRACT_DRUG, rows)
+    except sqlite3.Error as e:
+        logger.error("Error linking abstracts to drugs: %s", e)
+        raise
+
+
+def link_drug_diseases_bulk(rows: Iterable[Tuple[int, int]]) -> None:
+    """
+    Link many drugs to diseases in a single transaction.
+
+    Parameters:
+        rows (Iterable[Tuple[int, int]]): (drug_id, disease_id) pairs
+
+    Raises:
+        sqlite3.Error: If linking fails (nothing is committed)
+    """
+    conn = get_connection()
+    try:
+        with _write(conn):
+            _multirow_insert(conn, _LINK_DRUG_DISEASE, rows)
+    except sqlite3.Error as e:
+        logger.error("Error linking drugs to diseases: %s", e)
         raise
-    finally:
-        conn.close()
 
 
 def link_abstract_drug(abstract_id: int, drug_id: int) -> None:
@@ -340,25 +792,18 @@ def link_abstract_drug(abstract_id: int, drug_id: int) -> None:
     Raises:
         sqlite3.Error: If linking fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-        INSERT OR IGNORE INTO AbstractDrugs (abstract_id, drug_id)
-        VALUES (?, ?)
-        """,
-            (abstract_id, drug_id),
-        )
+        cursor.execute(_LINK_ABSTRACT_DRUG, (abstract_id, drug_id))
 
-        conn.commit()
-        logger.debug(f"Linked abstract {abstract_id} to drug {drug_id}")
+        _commit(conn)
+        logger.debug("Linked abstract %s to drug %s", abstract_id, drug_id)
     except sqlite3.Error as e:
-        logger.error(f"Error linking abstract to drug: {e}")
+        logger.error("Error linking abstract to drug: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
 
 
 def get_abstract_by_id(abstract_id: int) -> Optional[Dict[str, Any]]:
@@ -374,8 +819,8 @@ def get_abstract_by_id(abstract_id: int) -> Optional[Dict[str, Any]]:
     Raises:
         sqlite3.Error: If retrieval fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -390,22 +835,15 @@ def get_abstract_by_id(abstract_id: int) -> Optional[Dict[str, Any]]:
         result = cursor.fetchone()
 
         if result:
-            abstract_data = {
-                "abstract_id": result[0],
-                "file_name": result[1],
-                "abstract_text": result[2],
-                "created_at": result[3],
-            }
-            logger.debug(f"Retrieved abstract {abstract_id}")
+            abstract_data = dict(result)
+            logger.debug("Retrieved abstract %s", abstract_id)
             return abstract_data
         else:
-            logger.warning(f"No abstract found with ID: {abstract_id}")
+            logger.warning("No abstract found with ID: %s", abstract_id)
             return None
     except sqlite3.Error as e:
-        logger.error(f"Error retrieving abstract: {e}")
+        logger.error("Error retrieving abstract: %s", e)
         raise
-    finally:
-        conn.close()
 
 
 def clear_all_tables() -> None:
@@ -415,37 +853,24 @@ def clear_all_tables() -> None:
     Raises:
         sqlite3.Error: If clearing tables fails
     """
+    # Databases created before a table was added to _TABLES lack it; create any missing ones
+    ensure_tables()
+    conn = get_connection()
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-
-        # Disable foreign key constraints temporarily
-        cursor.execute("PRAGMA foreign_keys = OFF;")
-
-        # Get all table names
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-
-        # Clear each table
-        for table in tables:
-            table_name = table[0]
-            if table_name != "sqlite_sequence":  # Skip sqlite_sequence table
-                cursor.execute(f"DELETE FROM {table_name};")
-                logger.info(f"Cleared table: {table_name}")
-
-        # Reset auto-increment counters
-        cursor.execute("DELETE FROM sqlite_sequence;")
-
-        # Re-enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON;")
-
-        conn.commit()
+        # Clear every table (children before parents, so foreign keys hold throughout, then
+        # sqlite_sequence to reset auto-increment counters) in one transaction; an unfiltered
+        # DELETE lets SQLite truncate instead of deleting row by row
+        conn.executescript(
+            "BEGIN IMMEDIATE;\n"
+            + "".join(f"DELETE FROM {table_name};\n" for table_name in _TABLES)
+            + "DELETE FROM sqlite_sequence;\nCOMMIT;"
+        )
+        _name_caches.clear()
         logger.info("All tables cleared successfully")
     except sqlite3.Error as e:
-        logger.error(f"Error clearing tables: {e}")
+        logger.error("Error clearing tables: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
 
 
 def recreate_tables() -> None:
@@ -455,78 +880,69 @@ def recreate_tables() -> None:
     Raises:
         sqlite3.Error: If table recreation fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-
-        # Disable foreign key constraints temporarily
-        cursor.execute("PRAGMA foreign_keys = OFF;")
-
-        # Get all table names
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-
-        # Drop each table
-        for table in tables:
-            table_name = table[0]
-            if table_name != "sqlite_sequence":  # Skip sqlite_sequence table
-                cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
-                logger.info(f"Dropped table: {table_name}")
-
-        # Re-enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON;")
-
-        conn.commit()
+        # Drop every table, children before parents
+        conn.executescript("".join(f"DROP TABLE IF EXISTS {table_name};\n" for table_name in _TABLES))
+        _name_caches.clear()
         logger.info("All tables dropped successfully")
 
         # Create tables with new schema
         create_tables()
 
     except sqlite3.Error as e:
-        logger.error(f"Error recreating tables: {e}")
+        logger.error("Error recreating tables: %s", e)
+        _rollback(conn)
         raise
-    finally:
-        conn.close()
 
 
-def get_all_abstracts() -> List[Dict[str, Any]]:
+def iter_abstracts(batch_size: int = 256) -> Iterator[Dict[str, Any]]:
     """
-    Retrieve all abstracts from the Abstracts table.
+    Stream all abstracts from the Abstracts table in abstract_id order.
+
+    Rows are fetched batch_size at a time, so only one batch is held in memory.
+
+    Parameters:
+        batch_size (int): Rows fetched from SQLite per round trip
 
     Returns:
-        List[Dict[str, Any]]: List of abstract data dictionaries
+        Iterator[Dict[str, Any]]: Abstract data dictionaries
 
     Raises:
         sqlite3.Error: If retrieval fails
     """
+    conn = get_connection()
     try:
-        conn = create_connection()
         cursor = conn.cursor()
+        cursor.arraysize = batch_size
 
         cursor.execute(
             """
-        SELECT abstract_id, file_name, abstract_text, created_at
+        SELECT abstract_id AS id, file_name, abstract_text, created_at
         FROM Abstracts
         ORDER BY abstract_id
         """
         )
 
-        results = cursor.fetchall()
-        abstracts = []
-
-        for result in results:
-            abstract_data = {
-                "id": result[0],
-                "file_name": result[1],
-                "abstract_text": result[2],
-                "created_at": result[3],
-            }
-            abstracts.append(abstract_data)
-
-        logger.info(f"Retrieved {len(abstracts)} abstracts")
-        return abstracts
+        while rows := cursor.fetchmany():
+            yield from map(dict, rows)
     except sqlite3.Error as e:
-        logger.error(f"Error retrieving abstracts: {e}")
+        logger.error("Error retrieving abstracts: %s", e)
         raise
-    finally:
-        conn.close()
+
+
+def get_all_abstracts() -> List[Dict[str, Any]]:
+    """
+    Retrieve all abstracts from the Abstracts table.
+
+    Prefer iter_abstracts when the abstracts can be processed one at a time.
+
+    Returns:
+        List[Dict[str, Any]]: List of abstract data dictionaries
+
+    Raises:
+        sqlite3.Error: If retrieval fails
+    """
+    abstracts = list(iter_abstracts())
+    logger.info("Retrieved %d abstracts", len(abstracts))
+    return abstracts
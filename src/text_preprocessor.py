@@ -0,0 +1,140 @@
+import re
+from typing import List, Tuple
+
+# Upper bound on the text sent to the LLM (the abstract is always kept whole)
+MAX_RELEVANT_CHARS = 40_000
+
+# Section headers, by how useful their content is for extraction
+_PRIORITY_SECTIONS = ("abstract", "summary")
+_RELEVANT_SECTIONS = (
+    "methods", "materials and methods", "patients", "patients and methods", "results",
+    "safety", "adverse events", "toxicity", "discussion",
+)
+_OTHER_SECTIONS = (
+    "introduction", "background", "conclusion", "conclusions", "funding", "disclosures",
+    "declaration of interests", "conflict of interest", "conflicts of interest",
+    "role of the funding source", "study design", "data sharing",
+)
+_DROPPED_SECTIONS = (
+    "references", "acknowledgments", "acknowledgements", "author contributions",
+    "contributors", "supplementary", "supplementary material", "supplementary appendix",
+)
+
+_SECTION_RANKS = {
+    **{name: 0 for name in _PRIORITY_SECTIONS},
+    **{name: 1 for name in _RELEVANT_SECTIONS},
+    **{name: 2 for name in _OTHER_SECTIONS},
+    **{name: None for name in _DROPPED_SECTIONS},
+}
+
+# A header is a line holding only a known section name, optionally numbered,
+# markdown-styled (# / **) or extended with "and ..." (e.g. "Results and Discussion")
+_HEADER_RX = re.compile(
+    r"^[ \t]*(?:#{1,6}[ \t]*)?(?:\d+(?:\.\d+)*\.?[ \t]+)?(?:\*\*)?"
+    r"(?P<name>" + "|".join(sorted(map(re.escape, _SECTION_RANKS), key=len, reverse=True)) + r")"
+    r"(?:[ \t]+and[ \t]+[A-Za-z ]{1,30})?[ \t]*:?[ \t]*(?:\*\*)?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Any markdown header ends a dropped section, even one that is not a known section name
+# (e.g. a "## Table 2. Adverse events" heading placed after the references)
+_MARKDOWN_HEADER_RX = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+# Table rows and "Table N" / "Figure N" captions carry results, so they are kept even inside dropped sections
+_TABLE_ROW_RX = re.compile(r"^[ \t]*\|")
+_CAPTION_RX = re.compile(r"^[ \t]*(?:\*\*)?(?:table|figure|fig\.)[ \t]*S?\d+", re.IGNORECASE)
+
+# ClinicalTrials.gov identifiers (tolerating "NCT 0123456" style spacing) and trial names;
+# lines matching either are kept even inside dropped sections
+NCT_RX = re.compile(r"\bNCT\s*0*\d{6,8}\b", re.IGNORECASE)
+TRIAL_NAME_RX = re.compile(r"\b(?:keynote|checkmate|masterkey)", re.IGNORECASE)
+
+
+def has_nct_number(text: str) -> bool:
+    """Whether text mentions an NCT number; extraction requires one, so texts without it can skip the LLM."""
+    return NCT_RX.search(text) is not None
+
+
+def _cut(text: str, limit: int) -> str:
+    """Cut text to at most limit characters, on a line boundary when possible."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut + 1] if cut > 0 else text[:limit]
+
+
+def _salvage_lines(block: str) -> List[Tuple[str, int]]:
+    """(text, rank) pieces for the lines of a dropped section that are still worth keeping."""
+    pieces = []
+    in_caption = False
+    for line in block.splitlines(keepends=True):
+        # A caption runs until the next blank line
+        if _CAPTION_RX.match(line):
+            in_caption = True
+        elif not line.strip():
+            in_caption = False
+        if NCT_RX.search(line) or TRIAL_NAME_RX.search(line):
+            pieces.append((line, 0))
+        elif in_caption or _TABLE_ROW_RX.match(line):
+            pieces.append((line, 1))
+    return pieces
+
+
+def extract_relevant_sections(full_text: str, max_chars: int = MAX_RELEVANT_CHARS) -> str:
+    """
+    Reduce a publication to the parts that carry extraction-relevant information.
+
+    References, acknowledgments, author contributions and supplementary sections are
+    dropped up to the next section name or markdown header, except for lines mentioning
+    an NCT number or a trial name, table rows and "Table N" / "Figure N" captions. If the
+    result is still longer than max_chars, the leading text and abstract are kept whole,
+    then Methods/Results/Safety-type sections, tables and figures, then everything else,
+    until the budget is spent. Text without recognizable section headers is only capped.
+
+    For example, in
+
+        ## References
+        1. Smith J, et al. Lancet Oncol. 2020.
+        ## Table 2. Adverse events
+        | Neutropenia | 12% |
+        ## Figure 1
+        Median PFS 11.2 months
+
+    only the reference line is dropped; the table and the figure are kept.
+
+    Parameters:
+        full_text (str): The publication text
+        max_chars (int): Character budget for the returned text
+
+    Returns:
+        str: The reduced text, in original order
+    """
+    headers = list(_HEADER_RX.finditer(full_text))
+    if not headers:
+        return _cut(full_text, max_chars)
+
+    # (text, rank): rank 0 is always kept, higher ranks fill the remaining budget
+    pieces: List[Tuple[str, int]] = [(full_text[:headers[0].start()], 0)]
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(full_text)
+        block = full_text[header.start():end]
+        rank = _SECTION_RANKS[header.group("name").lower()]
+        if rank is not None:
+            pieces.append((block, rank))
+        else:
+            next_header = _MARKDOWN_HEADER_RX.search(full_text, header.end(), end)
+            stop = next_header.start() if next_header else end
+            pieces.extend(_salvage_lines(full_text[header.start():stop]))
+            if stop < end:
+                pieces.append((full_text[stop:end], 2))
+
+    budget = max_chars - sum(len(text) for text, rank in pieces if rank == 0)
+    kept = [text if rank == 0 else None for text, rank in pieces]
+    for wanted_rank in (1, 2):
+        for i, (text, rank) in enumerate(pieces):
+            if rank != wanted_rank or budget <= 0:
+                continue
+            kept[i] = _cut(text, budget)
+            budget -= len(kept[i])
+
+    return "".join(text for text in kept if text)
@@ -1,5 +1,7 @@
 # src/therapy_classifier.py
-from typing import Dict, List
+import re
+from functools import lru_cache
+from typing import Dict, List, Pattern, Tuple
 
 THERAPY_CATEGORIES: Dict[str, Dict[str, List[str]]] = {
     "Immune Checkpoint Inhibitors": {
@@ -32,6 +34,20 @@ THERAPY_CATEGORIES: Dict[str, Dict[str, List[str]]] = {
     }
 }
 
+# (category, lowercased known drugs across statuses), flattened once at import
+_LC_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    (category, tuple(known_drug.lower() for drug_list in sub_categories.values() for known_drug in drug_list))
+    for category, sub_categories in THERAPY_CATEGORIES.items()
+]
+
+# One pattern per category over its known drugs, in THERAPY_CATEGORIES order, so each
+# drug in a name is checked against the categories by precedence
+_CATEGORY_RXS: List[Tuple[str, Pattern[str]]] = [
+    (category, re.compile("|".join(map(re.escape, known_drugs))))
+    for category, known_drugs in _LC_CATEGORIES
+    if known_drugs
+]
+
 def classify_therapy(generic_name: str) -> str:
     """
     Classifies the therapy type based on the generic drug name.
@@ -44,14 +60,15 @@ def classify_therapy(generic_name: str) -> str:
     """
     if not generic_name or not isinstance(generic_name, str):
         return "Unknown"
+    return _classify_name(generic_name)
 
-    # Split combinations and check each drug
-    drug_names = [name.strip().lower() for name in generic_name.split('+')]
-
-    for drug in drug_names:
-        for category, sub_categories in THERAPY_CATEGORIES.items():
-            for status, drug_list in sub_categories.items():
-                if any(known_drug.lower() in drug for known_drug in drug_list):
-                    return category
+# Drug names recur across abstracts and arms, so each distinct name is matched once
+@lru_cache(maxsize=4096)
+def _classify_name(generic_name: str) -> str:
+    # Split combinations and check each drug; the first drug with a known category decides
+    for drug in generic_name.lower().split('+'):
+        for category, category_rx in _CATEGORY_RXS:
+            if category_rx.search(drug):
+                return category
     
     return "Unknown" 
\ No newline at end of file